@@ -0,0 +1,208 @@
+"""Weakness-targeted range-mode sampling.
+
+Every range-mode problem maps to a cell (op, x, y) with 1 ≤ x, y ≤ 100:
+the two operands for + − ×, and (quotient, divisor) for ÷, giving
+4 × 100 × 100 cells. Each cell's score rises with recent errors and slow
+answers. A Fenwick tree over all cells holds score × (how many range draws
+land on the cell), so a draw and a score update are both O(log n). Cells
+nobody has answered score 1, so with no history the draw matches the plain
+uniform range draw.
+"""
+import json
+import random
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from generator import OPS, RangePairIndex
+from preferences import atomic_write
+
+SIDE = 100
+OP_CELLS = SIDE * SIDE
+N_CELLS = len(OPS) * OP_CELLS
+
+ALPHA = 0.3          # weight of the newest answer in a cell's running averages
+ERROR_WEIGHT = 4.0   # a cell that is always wrong is drawn 5x as often
+SLOW_WEIGHT = 2.0    # ... and up to 2 * SLOW_CAP more if it is also slow
+SLOW_CAP = 2.0       # slowness is time / op's typical time - 1, clamped to [0, SLOW_CAP]
+SCALE = 1000         # scores are stored as integers in the tree, so sums never drift
+
+
+class FenwickTree:
+    """Prefix sums over non-negative integer weights with O(log n) update and search."""
+
+    def __init__(self, weights):
+        self.n = len(weights)
+        self.values = list(weights)
+        tree = [0] + self.values
+        for i in range(1, self.n + 1):  # O(n) build
+            j = i + (i & -i)
+            if j <= self.n:
+                tree[j] += tree[i]
+        self._tree = tree
+        self._top = 1 << (self.n.bit_length() - 1) if self.n else 0
+
+    def set(self, i: int, value: int):
+        delta = value - self.values[i]
+        if not delta:
+            return
+        self.values[i] = value
+        i += 1
+        while i <= self.n:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i: int) -> int:
+        """Sum of weights[0:i]."""
+        s = 0
+        while i > 0:
+            s += self._tree[i]
+            i -= i & -i
+        return s
+
+    def find(self, u: int) -> int:
+        """Smallest i with prefix(i + 1) > u, for 0 ≤ u < total."""
+        pos, step = 0, self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self._tree[nxt] <= u:
+                pos = nxt
+                u -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+
+def cell_of(op: str, n1, n2) -> Optional[int]:
+    """Cell index of a range-mode problem, or None if its operands are outside the grid."""
+    try:
+        a, b = int(n1), int(n2)
+        if a != n1 or b != n2:
+            return None
+    except (TypeError, ValueError):
+        return None
+    if op == '/':
+        if b == 0 or a % b:
+            return None
+        a //= b
+    if not (1 <= a <= SIDE and 1 <= b <= SIDE):
+        return None
+    return OPS.index(op) * OP_CELLS + (a - 1) * SIDE + (b - 1)
+
+
+def operands_of(cell: int) -> Tuple[str, int, int]:
+    op_i, rest = divmod(cell, OP_CELLS)
+    a, b = divmod(rest, SIDE)
+    op, a, b = OPS[op_i], a + 1, b + 1
+    return (op, a * b, b) if op == '/' else (op, a, b)
+
+
+class WeaknessModel:
+    """Per-cell error/slowness averages and the tree that samples from them.
+
+    ``record`` is called from the GUI thread and ``draw`` from the prefetch
+    thread, so both take the lock.
+    """
+
+    def __init__(self):
+        self.cells: Dict[int, list] = {}        # cell -> [error avg, slowness avg, answers]
+        self.typical_ns: Dict[str, float] = {}  # op -> running average response time
+        self._lock = threading.Lock()
+        self._index = None
+        self._mult = None
+        self._tree = None
+
+    def score(self, cell: int) -> float:
+        st = self.cells.get(cell)
+        if st is None:
+            return 1.0
+        return 1.0 + ERROR_WEIGHT * st[0] + SLOW_WEIGHT * st[1]
+
+    def _weight(self, cell: int) -> int:
+        m = self._mult.get(cell, 0)
+        return m * int(self.score(cell) * SCALE) if m else 0
+
+    # Sampling
+    def attach(self, index: RangePairIndex):
+        """Build the tree for the cells the current settings can produce."""
+        with self._lock:
+            if index is self._index:
+                return
+            mult = Counter()
+            for i, op in enumerate(OPS):
+                base = i * OP_CELLS - SIDE - 1
+                if op == '/':
+                    mult.update(base + (n1 // n2) * SIDE + n2 for n1, n2 in index.pairs[op])
+                else:
+                    mult.update(base + n1 * SIDE + n2 for n1, n2 in index.pairs[op])
+            self._index, self._mult = index, mult
+            weights = [0] * N_CELLS
+            for cell in mult:
+                weights[cell] = self._weight(cell)
+            self._tree = FenwickTree(weights)
+
+    def draw(self, op: str, rng=random) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            tree = self._tree
+            if tree is None:
+                return None
+            start = OPS.index(op) * OP_CELLS
+            lo = tree.prefix(start)
+            span = tree.prefix(start + OP_CELLS) - lo
+            if span <= 0:
+                return None
+            _, n1, n2 = operands_of(tree.find(lo + rng.randrange(span)))
+            return n1, n2
+
+    # Learning
+    def record(self, op: str, n1, n2, ok: bool, ns: int):
+        cell = cell_of(op, n1, n2)
+        if cell is None:
+            return
+        with self._lock:
+            typical = self.typical_ns.get(op)
+            self.typical_ns[op] = ns if typical is None else (1 - ALPHA) * typical + ALPHA * ns
+            slow = 0.0 if typical is None else min(SLOW_CAP, max(0.0, ns / typical - 1.0))
+            st = self.cells.get(cell)
+            if st is None:
+                # First answer sets the averages outright
+                self.cells[cell] = [0.0 if ok else 1.0, slow, 1]
+            else:
+                st[0] = (1 - ALPHA) * st[0] + ALPHA * (0.0 if ok else 1.0)
+                st[1] = (1 - ALPHA) * st[1] + ALPHA * slow
+                st[2] += 1
+            if self._tree is not None:
+                self._tree.set(cell, self._weight(cell))
+
+    def weakest(self, k: int = 5):
+        """The k highest-scoring cells above the baseline as (op, n1, n2, score)."""
+        with self._lock:
+            top = [c for c in sorted(self.cells, key=self.score, reverse=True)[:k] if self.score(c) > 1.0]
+            return [operands_of(c) + (round(self.score(c), 2),) for c in top]
+
+    # Persistence
+    def to_json(self) -> str:
+        with self._lock:
+            cells = {"%s:%d:%d" % operands_of(c): [round(st[0], 4), round(st[1], 4), st[2]]
+                     for c, st in self.cells.items()}
+            return json.dumps({"version": 1, "typical_ns": self.typical_ns, "cells": cells},
+                              separators=(",", ":"))
+
+    def save(self, path: Path):
+        atomic_write(path, self.to_json())
+
+    @classmethod
+    def load(cls, path: Path) -> "WeaknessModel":
+        model = cls()
+        try:
+            with Path(path).open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            model.typical_ns = {op: float(v) for op, v in data.get("typical_ns", {}).items() if op in OPS}
+            for key, st in data.get("cells", {}).items():
+                op, n1, n2 = key.split(":")
+                cell = cell_of(op, int(n1), int(n2)) if op in OPS else None
+                if cell is not None:
+                    model.cells[cell] = [float(st[0]), float(st[1]), int(st[2])]
+        except (OSError, ValueError, AttributeError, TypeError, IndexError):
+            pass  # missing or damaged scores just mean starting fresh
+        return model
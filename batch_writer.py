@@ -0,0 +1,76 @@
+"""Daemon writer thread shared by the logs and stores.
+
+``put`` and ``submit`` only enqueue, so callers never wait on the disk. The
+thread starts with the first item and drains the queue in batches: whatever
+queued up while the previous batch was written goes to the write callback
+in one call. ``submit`` pairs an item with a Future for the callback to
+resolve once the item is durable.
+"""
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, Callable, List
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+_STOP = object()
+
+
+class BatchWriter:
+    def __init__(self, write: Callable[[List[Any]], None], name: str):
+        self._write = write
+        self._name = name
+        self._queue = None
+        self._thread = None
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def put(self, item):
+        if self._thread is None:
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name=self._name, daemon=True)
+            self._thread.start()
+        self._queue.put(item)
+
+    def submit(self, item) -> "Future":
+        """Queue (item, future); the write callback resolves the future."""
+        from concurrent.futures import Future  # deferred: read-only clients never write
+        fut = Future()
+        self.put((item, fut))
+        return fut
+
+    def flush(self, timeout: float = 2.0):
+        """Block until everything queued so far has been written (tests, shutdown)."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout: float = 2.0):
+        """Write what is queued, then stop the thread; a later put starts a new one."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, q: queue.Queue):
+        while True:
+            batch = [q.get()]
+            while True:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            items = [b for b in batch if b is not _STOP and not isinstance(b, threading.Event)]
+            try:
+                if items:
+                    self._write(items)
+            finally:
+                for b in batch:
+                    if isinstance(b, threading.Event):
+                        b.set()
+            if any(b is _STOP for b in batch):
+                return
@@ -0,0 +1,49 @@
+"""Problems-per-second: NumPy batch generation vs the scalar generator.
+
+    python benchmarks/bench_bulk.py [-n 1000000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bulk import generate_batch  # noqa: E402
+from generator import ProblemGenerator, Settings  # noqa: E402
+
+CASES = {
+    "range": {"mode": "range"},
+    "range-tight": {"mode": "range", "max_solution_sigfigs": {"+": 1, "-": 1, "*": 2, "/": 1}},
+    "sigfigs": {"mode": "sigfigs"},
+    "sigfigs-wide": {"mode": "sigfigs",
+                     "sigfigs": {"A_sig": [1, 6], "A_exp": [-6, 6], "B_sig": [1, 6], "B_exp": [-6, 6]},
+                     "max_solution_sigfigs": {"+": 3, "-": 4, "*": 5, "/": 2}},
+}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", type=int, default=1_000_000, help="problems per batch")
+    args = ap.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    print(f"{'case':12} {'batch/s':>12} {'scalar/s':>12} {'speedup':>8}")
+    for name, prefs in CASES.items():
+        settings = Settings.from_prefs(prefs)
+        t0 = time.perf_counter()
+        generate_batch(settings, args.n, rng)
+        batch = args.n / (time.perf_counter() - t0)
+        gen = ProblemGenerator(settings)
+        n_scalar = max(1000, args.n // 50)
+        t0 = time.perf_counter()
+        for _ in range(n_scalar):
+            gen.generate()
+        scalar = n_scalar / (time.perf_counter() - t0)
+        print(f"{name:12} {batch:12.0f} {scalar:12.0f} {batch / scalar:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
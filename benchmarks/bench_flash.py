@@ -0,0 +1,109 @@
+"""Per-answer cost of the answer flash at a sustained answering rate.
+
+``legacy_flash`` is the flash as it was on ``ArithmeticTrainer``: a
+top-level ``setStyleSheet`` and a restore 120 ms later, with the restore
+lambda disconnected and reconnected on every answer. It is kept here
+verbatim as the baseline. Both variants run on a game screen whose
+preferences panel has been built, as it is after visiting Preferences.
+
+For each variant we fire flashes on a fixed schedule (default 2.5/s,
+alternating green/red) and report the GUI thread's CPU time per answer
+(the flash, its restore and the repaints they cause), plus the wall time
+of the flash call itself.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_flash.py [-n 20] [--rate 2.5]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from main import ArithmeticTrainer  # noqa: E402
+
+DATA_DIR = Path(tempfile.mkdtemp(prefix="trainer-bench-"))  # keeps the games out of the app's own logs
+
+
+# ---------------- Baseline: restyle the whole window ----------------
+def legacy_flash(t, color: str):
+    if t._flash_restore_timer.isActive():
+        t._flash_restore_timer.stop()
+    flash_css = "background-color: #3ddc84;" if color == 'green' else "background-color: #ff6b6b;"
+    t.setStyleSheet(flash_css)
+    try:
+        if t._flash_restore_timer.receivers(t._flash_restore_timer.timeout):
+            t._flash_restore_timer.timeout.disconnect()
+    except Exception:
+        pass
+    t._flash_restore_timer.timeout.connect(lambda: t.setStyleSheet(t._base_stylesheet))
+    t._flash_restore_timer.start(120)
+
+
+def _trainer() -> ArithmeticTrainer:
+    t = ArithmeticTrainer(DATA_DIR)
+    t._ensure_settings_panel()
+    t.show()
+    t.start_game()
+    t.timer.stop()  # keep the countdown out of the measurement
+    return t
+
+
+def _run(app, flash, n: int, rate: float) -> dict:
+    calls = []
+    loop = QEventLoop()
+    count = [0]
+
+    def answer():
+        color = 'green' if count[0] % 2 else 'red'
+        t0 = time.perf_counter()
+        flash(color)
+        calls.append(time.perf_counter() - t0)
+        count[0] += 1
+        if count[0] == n:
+            # Let the last restore land before stopping
+            QTimer.singleShot(int(1000 / rate), loop.quit)
+
+    timer = QTimer()
+    timer.timeout.connect(lambda: answer() if count[0] < n else timer.stop())
+    app.processEvents()
+    cpu0 = time.thread_time()
+    timer.start(int(1000 / rate))
+    loop.exec_()
+    cpu = time.thread_time() - cpu0
+    return {"cpu_ms": 1000 * cpu / n, "call_ms": 1000 * statistics.median(calls)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", type=int, default=20, help="answers per variant")
+    ap.add_argument("--rate", type=float, default=2.5, help="answers per second")
+    args = ap.parse_args(argv)
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    try:
+        legacy = _trainer()
+        legacy._base_stylesheet = legacy.styleSheet()
+        legacy._flash_restore_timer.timeout.disconnect()
+        current = _trainer()
+
+        print(f"{'variant':10} {'cpu/answer':>12} {'flash call':>12}   ({args.n} answers at {args.rate}/s)")
+        for name, t, flash in (("stylesheet", legacy, lambda c: legacy_flash(legacy, c)),
+                               ("overlay", current, current._do_flash)):
+            r = _run(app, flash, args.n, args.rate)
+            print(f"{name:10} {r['cpu_ms']:9.2f} ms {r['call_ms']:9.2f} ms")
+            t.close()
+    finally:
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
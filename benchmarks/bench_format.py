@@ -0,0 +1,68 @@
+"""Problem building and grading with and without the formatting memo.
+
+Each iteration does what one answered problem costs in strings: build it
+(operand, problem and answer text) and grade a typed answer, right or
+wrong. Both runs see the same seeded stream; "of" formats from scratch,
+"memo" goes through the tables as the generator does in range mode. With
+no table for typed input, "of" grades through ``Num.parse`` directly. Hit
+rates are from the memo run.
+
+    python benchmarks/bench_format.py [-n 100000] [--wrong 0.3]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import generator  # noqa: E402
+from generator import Problem, ProblemGenerator, Settings, format_cache_clear, format_cache_stats  # noqa: E402
+
+
+def _stream(settings: Settings, n: int, wrong: float):
+    gen = ProblemGenerator(settings, rng=random.Random(1234))
+    rng = random.Random(99)
+    out = []
+    for _ in range(n):
+        p = gen.generate()
+        typed = p.answer_text if rng.random() >= wrong else str(p.answer + p.n2)
+        out.append((p.op, p.n1, p.n2, typed))
+    return out
+
+
+def _rate(build, stream) -> float:
+    t0 = time.perf_counter()
+    for op, n1, n2, typed in stream:
+        build(op, n1, n2).grade(typed)
+    return len(stream) / (time.perf_counter() - t0)
+
+
+def _plain(stream) -> float:
+    saved = generator._parse_input_cached
+    generator._parse_input_cached = generator._parse_input_uncached
+    try:
+        return _rate(Problem.of, stream)
+    finally:
+        generator._parse_input_cached = saved
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", type=int, default=100000, help="problems per measurement")
+    ap.add_argument("--wrong", type=float, default=0.3, help="share of wrong typed answers")
+    args = ap.parse_args(argv)
+
+    print(f"{'mode':8} {'of/s':>9} {'memo/s':>9} {'speedup':>8}  hit rate (numbers / answers / inputs)")
+    for mode in ("range", "sigfigs"):
+        stream = _stream(Settings(mode=mode), args.n, args.wrong)
+        base = _plain(stream)
+        format_cache_clear()
+        memo = _rate(Problem.memo, stream)
+        rates = " / ".join(f"{st['hit_rate']:.1%}" for st in format_cache_stats().values())
+        print(f"{mode:8} {base:9.0f} {memo:9.0f} {memo / base:7.2f}x  {rates}")
+
+
+if __name__ == "__main__":
+    main()
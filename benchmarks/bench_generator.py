@@ -0,0 +1,186 @@
+"""Problems-per-second: headless generator vs the original widget-bound path.
+
+``legacy_generate`` is the generation loop as it was when it lived on
+``ArithmeticTrainer``: rejection sampling with every setting read back from
+the live QSpinBox/QCheckBox widgets on each attempt, all in Decimal. It is
+kept here verbatim as the baseline.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_generator.py [-n 20000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generator import ProblemGenerator, Settings, compute_answer, decimal_places_leq_one, norm, sigfigs  # noqa: E402
+
+
+def _rate(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - t0)
+
+
+# ---------------- Baseline: widget-bound rejection loop ----------------
+def _rand_sigfig_value(sf_min, sf_max, exp_min, exp_max) -> Decimal:
+    sf_lo, sf_hi = norm(sf_min, sf_max)
+    k_lo, k_hi = norm(exp_min, exp_max)
+    sf = random.randint(sf_lo, sf_hi)
+    k = random.randint(k_lo, k_hi)
+    m_lo = 10 ** (sf - 1)
+    m_hi = 10 ** sf - 1
+    while True:
+        m = random.randint(m_lo, m_hi)
+        if m % 10 != 0 or sf == 1:
+            break
+    val = Decimal(m) * (Decimal(10) ** Decimal(k - (sf - 1)))
+    return val.normalize()
+
+
+def _rand_quotient_max_one_decimal() -> Decimal:
+    if random.random() < 0.5:
+        q = Decimal(random.randint(-99, 99))
+        return q if q != 0 else Decimal(1)
+    k = random.randint(-990, 990)
+    if k % 10 == 0:
+        k += 1
+    return Decimal(k) / Decimal(10)
+
+
+def _weighted_choice_operator(t):
+    ops, weights = [], []
+    if t.addition_checkbox.isChecked():       ops.append('+'); weights.append(t.add_weight_slider.value())
+    if t.subtraction_checkbox.isChecked():    ops.append('-'); weights.append(t.sub_weight_slider.value())
+    if t.multiplication_checkbox.isChecked(): ops.append('*'); weights.append(t.mul_weight_slider.value())
+    if t.division_checkbox.isChecked():       ops.append('/'); weights.append(t.div_weight_slider.value())
+    if not ops:
+        return None
+    if any(w > 0 for w in weights):
+        return random.choices([o for o, w in zip(ops, weights) if w > 0], weights=[w for w in weights if w > 0], k=1)[0]
+    return random.choice(ops)
+
+
+def _cap_ok_for_result(t, op, result) -> bool:
+    s = sigfigs(result)
+    if op == '+': return s <= t.max_sig_add_spin.value()
+    if op == '-': return s <= t.max_sig_sub_spin.value()
+    if op == '*': return s <= t.max_sig_mul_spin.value()
+    return s <= t.max_sig_div_spin.value() and decimal_places_leq_one(result)
+
+
+def legacy_generate(t):
+    op = _weighted_choice_operator(t)
+    if not op:
+        return None
+    last_pair = None
+    for _ in range(800):
+        if t.mode == "range":
+            if op in ('+', '-'):
+                (a_lo, a_hi) = norm(t.addition_range1_spinbox1.value(), t.addition_range1_spinbox2.value())
+                (b_lo, b_hi) = norm(t.addition_range2_spinbox1.value(), t.addition_range2_spinbox2.value())
+                n1, n2 = Decimal(random.randint(a_lo, a_hi)), Decimal(random.randint(b_lo, b_hi))
+                if op == '-' and n1 < n2:
+                    n1, n2 = n2, n1
+            else:
+                (x_lo, x_hi) = norm(t.multiplication_range1_spinbox1.value(), t.multiplication_range1_spinbox2.value())
+                (y_lo, y_hi) = norm(t.multiplication_range2_spinbox1.value(), t.multiplication_range2_spinbox2.value())
+                n1i, n2i = random.randint(x_lo, x_hi), random.randint(y_lo, y_hi)
+                n1, n2 = (Decimal(n1i * n2i), Decimal(n2i)) if op == '/' else (Decimal(n1i), Decimal(n2i))
+            last_pair = (n1, n2)
+            if _cap_ok_for_result(t, op, compute_answer(n1, n2, op)):
+                break
+        elif op == '/':
+            A_min, A_max = t.a_sig_min.value(), t.a_sig_max.value()
+            B_min, B_max = t.b_sig_min.value(), t.b_sig_max.value()
+            built = False
+            for _attempt in range(400):
+                use_A_for_left = random.choice([True, False])
+                sfa = random.randint(*norm(A_min, A_max))
+                sfb = random.randint(*norm(B_min, B_max))
+                if use_A_for_left:
+                    b = _rand_sigfig_value(t.b_sig_min.value(), t.b_sig_max.value(), t.b_exp_min.value(), t.b_exp_max.value())
+                    lo, hi, target = B_min, B_max, sfa
+                else:
+                    b = _rand_sigfig_value(t.a_sig_min.value(), t.a_sig_max.value(), t.a_exp_min.value(), t.a_exp_max.value())
+                    lo, hi, target = A_min, A_max, sfb
+                if not (lo <= sigfigs(b) <= hi) or b == 0:
+                    continue
+                a = _rand_quotient_max_one_decimal() * b
+                if sigfigs(a) != target or not _cap_ok_for_result(t, '/', a / b):
+                    continue
+                last_pair = (a, b)
+                built = True
+                break
+            if built:
+                break
+            n2 = Decimal(random.randint(2, 99))
+            n1 = n2 * Decimal(random.randint(1, 99))
+            if _cap_ok_for_result(t, '/', n1 / n2):
+                last_pair = (n1, n2)
+                break
+        else:
+            use_A_for_left = random.choice([True, False])
+            a_val = _rand_sigfig_value(t.a_sig_min.value(), t.a_sig_max.value(), t.a_exp_min.value(), t.a_exp_max.value())
+            b_val = _rand_sigfig_value(t.b_sig_min.value(), t.b_sig_max.value(), t.b_exp_min.value(), t.b_exp_max.value())
+            n1, n2 = (a_val, b_val) if use_A_for_left else (b_val, a_val)
+            if op == '-' and n1 < n2:
+                n1, n2 = n2, n1
+            if _cap_ok_for_result(t, op, compute_answer(n1, n2, op)):
+                last_pair = (n1, n2)
+                break
+    return last_pair
+
+
+# ---------------- Runner ----------------
+CASES = {
+    "range": {"mode": "range"},
+    "range-tight": {"mode": "range", "max_solution_sigfigs": {"+": 1, "-": 1, "*": 2, "/": 1}},
+    "sigfigs": {"mode": "sigfigs"},
+    "sigfigs-div": {"mode": "sigfigs", "ops": {"+": False, "-": False, "*": False},
+                    "sigfigs": {"A_sig": [5, 6], "A_exp": [0, 2], "B_sig": [2, 2], "B_exp": [0, 0]},
+                    "max_solution_sigfigs": {"/": 3}},
+}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", type=int, default=20000, help="problems per measurement")
+    args = ap.parse_args(argv)
+
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        from main import ArithmeticTrainer
+        app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    except ImportError:
+        ArithmeticTrainer = None
+
+    data_dir = Path(tempfile.mkdtemp(prefix="trainer-bench-"))  # keeps the trainers off the app's own files
+    print(f"{'case':12} {'headless/s':>12} {'widgets/s':>12} {'speedup':>8}")
+    try:
+        for name, prefs in CASES.items():
+            gen = ProblemGenerator(Settings.from_prefs(prefs))
+            headless = _rate(gen.generate, args.n)
+            if ArithmeticTrainer is None:
+                print(f"{name:12} {headless:12.0f} {'(no PyQt5)':>12}")
+                continue
+            trainer = ArithmeticTrainer(data_dir)
+            trainer._ensure_settings_panel()  # the legacy loop reads the widgets
+            trainer._apply_preferences(prefs)
+            # The baseline is orders of magnitude slower on the tight cases; time fewer problems
+            widgets = _rate(lambda: legacy_generate(trainer), max(200, args.n // 20))
+            print(f"{name:12} {headless:12.0f} {widgets:12.0f} {headless / widgets:7.1f}x")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Num vs 100-digit Decimal on the per-problem hot path.
+
+Each iteration does what one sig-figs problem costs end to end: build the two
+operands, compute the exact answer, count its sig figs and decimal places for the cap, format the
+problem and the answer, parse the typed answer and compare.
+
+    python benchmarks/bench_numeric.py [-n 50000]
+"""
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generator import compute_answer, decimal_places_leq_one, format_num, problem_text, sigfigs  # noqa: E402
+from numeric import Num  # noqa: E402
+
+
+def _corpus(n: int):
+    rng = random.Random(1234)
+    out = []
+    for _ in range(n):
+        sf1, sf2 = rng.randint(2, 4), rng.randint(2, 4)
+        m1 = rng.randint(10 ** (sf1 - 1), 10 ** sf1 - 1)
+        m2 = rng.randint(10 ** (sf2 - 1), 10 ** sf2 - 1)
+        out.append((m1, rng.randint(-4, 2), m2, rng.randint(-4, 2), rng.choice('+-*/')))
+    return out
+
+
+def _decimal_path(m1, e1, m2, e2, op):
+    a = (Decimal(m1) * (Decimal(10) ** Decimal(e1))).normalize()
+    b = (Decimal(m2) * (Decimal(10) ** Decimal(e2))).normalize()
+    if op == '/':
+        a = a * b
+    res = compute_answer(a, b, op)
+    sigfigs(res)
+    decimal_places_leq_one(res)
+    problem_text(a, op, b)
+    typed = format_num(res)
+    return Decimal(typed) == res
+
+
+def _num_path(m1, e1, m2, e2, op):
+    a, b = Num(m1, e1), Num(m2, e2)
+    if op == '/':
+        a = a * b
+    res = compute_answer(a, b, op)
+    res.sigfigs()
+    res.decimal_places_leq_one()
+    problem_text(a, op, b)
+    typed = str(res)
+    return Num.parse(typed) == res
+
+
+def _rate(fn, corpus) -> float:
+    t0 = time.perf_counter()
+    for args in corpus:
+        fn(*args)
+    return len(corpus) / (time.perf_counter() - t0)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", type=int, default=50000, help="problems per measurement")
+    args = ap.parse_args(argv)
+
+    corpus = _corpus(args.n)
+    assert all(_decimal_path(*c) and _num_path(*c) for c in corpus[:1000])
+    dec = _rate(_decimal_path, corpus)
+    num = _rate(_num_path, corpus)
+    print(f"{'path':8} {'problems/s':>12}")
+    print(f"{'Decimal':8} {dec:12.0f}")
+    print(f"{'Num':8} {num:12.0f}")
+    print(f"speedup  {num / dec:11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
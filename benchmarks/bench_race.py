@@ -0,0 +1,138 @@
+"""Load test for race.py: many simulated players against one local server.
+
+Starts ``race.py`` as a subprocess on a free port and connects N asyncio
+clients from this process. Each client answers every problem after an
+exponentially distributed think time, correctly with the given accuracy
+(answers are worked out from the problem's operands with ``compute_answer``).
+Reports the round-trip time from sending an answer to receiving its result,
+the leaderboard pushes received, and the server's CPU time per answer. It
+also checks that every client saw the same problem at each index and that
+the final board agrees with what each client was told.
+
+    python benchmarks/bench_race.py [-n 300] [--time 20] [--think 1.0] [--accuracy 0.8]
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generator import compute_answer  # noqa: E402
+from numeric import Num  # noqa: E402
+from stats import percentile  # noqa: E402
+
+
+class Sim:
+    def __init__(self, name: str, think: float, accuracy: float, rng: random.Random, seen: dict):
+        self.name = name
+        self.think = think
+        self.accuracy = accuracy
+        self.rng = rng
+        self.seen = seen          # shared: problem index -> text, to check everyone gets the same stream
+        self.rtts = []
+        self.score = 0
+        self.leaderboards = 0
+        self.final = None
+        self.mismatches = 0
+        self._sent_ns = 0
+
+    async def play(self, host: str, port: int):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(json.dumps({"type": "join", "name": self.name}).encode() + b"\n")
+        pending = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                msg = json.loads(line)
+                kind = msg["type"]
+                if kind == "problem":
+                    if self.seen.setdefault(msg["i"], msg["text"]) != msg["text"]:
+                        self.mismatches += 1
+                    if pending is not None:
+                        pending.cancel()
+                    pending = asyncio.ensure_future(self._answer(writer, msg))
+                elif kind == "result":
+                    self.rtts.append(time.perf_counter_ns() - self._sent_ns)
+                    self.score = msg["score"]
+                elif kind == "leaderboard":
+                    self.leaderboards += 1
+                elif kind == "end":
+                    self.final = msg
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            if pending is not None:
+                pending.cancel()
+            writer.close()
+
+    async def _answer(self, writer, msg: dict):
+        await asyncio.sleep(self.rng.expovariate(1 / self.think))
+        answer = compute_answer(Num.parse(msg["n1"]), Num.parse(msg["n2"]), msg["op"])
+        text = str(answer) if self.rng.random() < self.accuracy else str(answer + Num(1))
+        self._sent_ns = time.perf_counter_ns()
+        writer.write(json.dumps({"type": "answer", "i": msg["i"], "text": text}).encode() + b"\n")
+
+
+async def run(args) -> dict:
+    server = subprocess.Popen(
+        [sys.executable, str(ROOT / "race.py"), "--port", "0", "--seed", str(args.seed), "--time", str(args.time),
+         "--players", str(args.clients), "--lobby", "60"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    banner = server.stderr.readline()
+    host, port = banner.split("listening on ", 1)[1].split(",", 1)[0].rsplit(":", 1)
+    rng = random.Random(args.seed)
+    seen = {}
+    sims = [Sim(f"sim{i:04d}", args.think, args.accuracy, random.Random(rng.random()), seen)
+            for i in range(args.clients)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(s.play(host, int(port)) for s in sims))
+    wall = time.perf_counter() - t0
+    out, _ = await asyncio.get_running_loop().run_in_executor(None, server.communicate)
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    rtts = sorted(r for s in sims for r in s.rtts)
+    answers = len(rtts)
+    finals = [s.final for s in sims if s.final is not None]
+    board = {name: score for name, score, _ in finals[0]["top"]} if finals else {}
+    return {
+        "clients": args.clients,
+        "finished": len(finals),
+        "answers": answers,
+        "answers_per_s": round(answers / args.time, 1),
+        "rtt_ms": {f"p{p}": round(percentile(rtts, p) / 1e6, 2) for p in (50, 90, 99)} if rtts else {},
+        "rtt_max_ms": round(rtts[-1] / 1e6, 2) if rtts else None,
+        "leaderboards_per_client": statistics.mean(s.leaderboards for s in sims),
+        "server_cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+        "server_cpu_us_per_answer": round((usage.ru_utime + usage.ru_stime) / max(1, answers) * 1e6, 1),
+        "stream_mismatches": sum(s.mismatches for s in sims),
+        "score_mismatches": sum(1 for s in sims if board.get(s.name) != s.score),
+        "drift_ms": finals[0]["timing"]["drift_ms"] if finals else None,
+        "wall_s": round(wall, 2),
+        "server_summary": out.strip().splitlines()[:2],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", "--clients", type=int, default=300)
+    ap.add_argument("--time", type=float, default=20.0, help="game length in seconds")
+    ap.add_argument("--think", type=float, default=1.0, help="mean seconds per answer")
+    ap.add_argument("--accuracy", type=float, default=0.8)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Query times for results.py on a large synthetic history.
+
+Fills a fresh database with N attempts spread over the past year, written
+the way games write them (one transaction per game through ``save_game``),
+then times the history queries against it: per-operand accuracy over 30
+days and all time, "slowest 50", and history pages near the start and
+deep into the table.
+
+    python benchmarks/bench_results.py [-n 2000000] [--per-game 60] [--db /tmp/bench.sqlite3]
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from results import DAY_S, PAGE_SIZE, ResultsStore  # noqa: E402
+from stats import percentile  # noqa: E402
+
+OPS = ("+", "-", "*", "/")
+
+
+def fill(store: ResultsStore, n: int, per_game: int, rng: random.Random) -> float:
+    now = time.time()
+    t0 = time.perf_counter()
+    fut = None
+    for g in range(0, n, per_game):
+        start = now - 365 * DAY_S * (1 - g / n)
+        rows = []
+        for k in range(min(per_game, n - g)):
+            a, b = rng.randint(2, 99), rng.randint(2, 99)
+            ok = rng.random() < 0.85
+            rows.append((start + 2 * k, "range", rng.choice(OPS), str(a), str(b), str(a * b),
+                         str(a * b if ok else a * b + 1), ok, int(rng.lognormvariate(21, 0.5))))
+        fut = store.save_game({"ts": start, "score": sum(r[7] for r in rows), "attempts": len(rows)}, rows)
+    fut.result()
+    return time.perf_counter() - t0
+
+
+def timed(fn, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn()
+        runs.append(time.perf_counter_ns() - t0)
+    runs.sort()
+    return {"p50_ms": round(percentile(runs, 50) / 1e6, 3), "max_ms": round(runs[-1] / 1e6, 3)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", type=int, default=2_000_000, help="attempts to generate")
+    ap.add_argument("--per-game", type=int, default=60)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--db", help="database file (default: a temporary one)")
+    args = ap.parse_args(argv)
+
+    path = Path(args.db) if args.db else Path(tempfile.mkdtemp()) / "results.sqlite3"
+    store = ResultsStore(path)
+    fill_s = fill(store, args.n, args.per_game, random.Random(1))
+    deep = store.page(None, 1)[0][0] // 2
+    queries = {
+        "accuracy * 7, 30 days": lambda: store.accuracy("*", 7, days=30),
+        "accuracy * 7, all time": lambda: store.accuracy("*", 7),
+        "accuracy *, 30 days": lambda: store.accuracy("*", days=30),
+        "slowest 50": lambda: store.slowest(50),
+        "first page": lambda: store.page(None, PAGE_SIZE),
+        "page halfway": lambda: store.page(deep, PAGE_SIZE),
+    }
+    report = {
+        "attempts": store.count(),
+        "fill_s": round(fill_s, 2),
+        "rows_per_s": round(args.n / fill_s),
+        "db_mb": round(sum(p.stat().st_size for p in path.parent.glob(path.name + "*")) / 2 ** 20, 1),
+        "queries": {name: timed(fn, args.repeat) for name, fn in queries.items()},
+        "answers": {"accuracy * 7, 30 days": store.accuracy("*", 7, days=30)},
+    }
+    store.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Microbenchmarks for the GUI hot paths under the offscreen Qt platform.
+
+Times ``generate_problem`` for every mode × operator × cap combination,
+``check_answer`` per submission, the ``_format_num``/``_sigfigs`` helpers and
+``_build_history_table`` at 100, 1k and 10k rows. Results are written as JSON
+so runs from two commits can be diffed. Trainers keep their preferences and
+logs in a temporary directory, never the app's own files:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/suite.py --json before.json
+    QT_QPA_PLATFORM=offscreen python benchmarks/suite.py --json after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from generator import OPS, compute_answer  # noqa: E402
+from main import ArithmeticTrainer  # noqa: E402
+from numeric import Num  # noqa: E402
+from prefetch import ProblemPrefetcher  # noqa: E402
+
+CAPS = {
+    "default": {"+": 5, "-": 5, "*": 4, "/": 4},
+    "tight": {"+": 1, "-": 1, "*": 2, "/": 1},
+}
+HISTORY_SIZES = (100, 1000, 10000)
+DATA_DIR = Path(tempfile.mkdtemp(prefix="trainer-bench-"))  # attempts, sessions, results, preferences
+
+
+def _measure(fn, number: int, repeat: int, setup=None) -> dict:
+    """Per-call nanoseconds over `repeat` runs of `number` calls each."""
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter_ns() - t0) / number)
+    return {"ns_min": min(runs), "ns_median": statistics.median(runs), "number": number, "repeat": repeat}
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _trainer(app, mode: str, op: str = None, caps=None) -> ArithmeticTrainer:
+    t = ArithmeticTrainer(DATA_DIR)
+    prefs = {"mode": mode}
+    if op is not None:
+        prefs["ops"] = {o: o == op for o in OPS}
+    if caps is not None:
+        prefs["max_solution_sigfigs"] = caps
+    t._apply_preferences(prefs)
+    t._refresh_generator()
+    # Depth 0 keeps the worker idle so every call generates inline (the miss path)
+    t.prefetcher.stop()
+    t.prefetcher = ProblemPrefetcher(depth=0)
+    t.prefetcher.reset(t.generator)
+    return t
+
+
+def bench_generate(app, scale: float) -> dict:
+    out = {}
+    for mode in ("range", "sigfigs"):
+        for op in OPS:
+            for cap_name, caps in CAPS.items():
+                t = _trainer(app, mode, op, caps)
+                out[f"generate_problem/{mode}/{op}/{cap_name}"] = _measure(t.generate_problem, int(2000 * scale), 5)
+                t.deleteLater()
+    return out
+
+
+def bench_check_answer(app, scale: float) -> dict:
+    out = {}
+    for mode in ("range", "sigfigs"):
+        t = _trainer(app, mode)
+        t.show()
+        t.start_game()
+        t.timer.stop()
+
+        def submit_correct():
+            t.answer_entry.setText(str(compute_answer(t.num1, t.num2, t.operator)))
+            t.check_answer()
+
+        def submit_wrong():
+            t.answer_entry.setText("-0.123")
+            t.check_answer()
+
+        out[f"check_answer/{mode}/correct"] = _measure(submit_correct, int(1000 * scale), 5)
+        out[f"check_answer/{mode}/wrong"] = _measure(submit_wrong, int(1000 * scale), 5)
+        t.close()
+        t.deleteLater()
+    return out
+
+
+def bench_helpers(app, scale: float) -> dict:
+    t = ArithmeticTrainer(DATA_DIR)
+    values = [Num(1234, -2), Num(5), Num(-75, -1), Num(10203, 3)]
+    number = int(20000 * scale)
+
+    def fmt():
+        for v in values:
+            t._format_num(v)
+
+    def sig():
+        for v in values:
+            t._sigfigs(v)
+
+    return {
+        "_format_num": _measure(fmt, number, 5),
+        "_sigfigs": _measure(sig, number, 5),
+    }
+
+
+def bench_history_table(app, scale: float) -> dict:
+    out = {}
+    t = ArithmeticTrainer(DATA_DIR)
+    t.show()
+    for size in HISTORY_SIZES:
+        t.history = [{"problem": f"{i} + {i}", "user": str(2 * i + (i % 3 == 0)), "correct": str(2 * i),
+                      "ok": i % 3 != 0} for i in range(size)]
+        repeat = 5 if size < 10000 else 3
+        out[f"_build_history_table/{size}"] = _measure(t._build_history_table, 1, repeat, setup=app.processEvents)
+    t.close()
+    return out
+
+
+def _compare(results: dict, baseline_path: str):
+    base = json.loads(Path(baseline_path).read_text(encoding="utf-8"))["results"]
+    print(f"\n{'benchmark':45} {'before ns':>12} {'after ns':>12} {'change':>8}")
+    for name, r in results.items():
+        if name not in base:
+            continue
+        b, a = base[name]["ns_min"], r["ns_min"]
+        print(f"{name:45} {b:12.0f} {a:12.0f} {(a - b) / b * 100:+7.1f}%")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--compare", help="baseline JSON from an earlier run")
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply iteration counts")
+    args = ap.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    try:
+        for bench in (bench_generate, bench_check_answer, bench_helpers, bench_history_table):
+            results.update(bench(app, args.scale))
+    finally:
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+    for name, r in results.items():
+        print(f"{name:45} {r['ns_min']:12.0f} ns")
+    if args.compare:
+        _compare(results, args.compare)
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "commit": _git_rev(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(),
+            "results": results,
+        }, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""NumPy batch generation for worksheets and offline problem banks.
+
+``generate_batch`` draws whole arrays of operators and operands and applies
+the ``max_sig_*`` caps as vectorized masks, re-drawing only the rejected rows,
+so it makes the same accept/reject decisions as ``ProblemGenerator.cap_ok``
+without a Python-level loop per problem. Operands are carried as int64
+(mantissa, exponent) pairs, the same normalized form ``Num`` uses.
+"""
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+
+from generator import OPS, Problem, Settings, SigfigDivisionSampler
+from numeric import Num
+
+_POW10 = 10 ** np.arange(19, dtype=np.int64)
+_ADD, _SUB, _MUL, _DIV = range(4)
+# Same cap on rejection rounds as the scalar generator
+MAX_ROUNDS = 800
+
+
+@dataclass
+class Batch:
+    """Problems as parallel arrays; op indexes into OPS, operands are m·10^e."""
+    op: np.ndarray
+    m1: np.ndarray
+    e1: np.ndarray
+    m2: np.ndarray
+    e2: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.op)
+
+    def problems(self) -> Iterator[Problem]:
+        for op, m1, e1, m2, e2 in zip(self.op.tolist(), self.m1.tolist(), self.e1.tolist(),
+                                      self.m2.tolist(), self.e2.tolist()):
+            yield Problem.of(OPS[op], Num(m1, e1), Num(m2, e2))
+
+
+# ---------------- Vectorized number helpers ----------------
+def _strip_zeros(m: np.ndarray, e: np.ndarray):
+    m, e = m.copy(), e.copy()
+    while True:
+        mask = (m != 0) & (m % 10 == 0)
+        if not mask.any():
+            return m, e
+        m[mask] //= 10
+        e[mask] += 1
+
+
+def _digits(m: np.ndarray) -> np.ndarray:
+    # Digit count of |m|, with 0 counting as one digit like sigfigs()
+    d = np.searchsorted(_POW10, np.abs(m), side='right')
+    return np.maximum(d, 1)
+
+
+def _sigfigs(m: np.ndarray) -> np.ndarray:
+    return _digits(_strip_zeros(m, np.zeros_like(m))[0])
+
+
+def _less(m1, e1, m2, e2) -> np.ndarray:
+    """m1·10^e1 < m2·10^e2 for non-negative normalized operands."""
+    adj1 = e1 + _digits(m1) - 1
+    adj2 = e2 + _digits(m2) - 1
+    out = adj1 < adj2
+    same = adj1 == adj2
+    if same.any():
+        # Same magnitude: exponents differ by less than the digit count, so aligning fits int64
+        s1, s2 = m1[same], m2[same]
+        base = np.minimum(e1[same], e2[same])
+        out[same] = s1 * _POW10[e1[same] - base] < s2 * _POW10[e2[same] - base]
+    return out
+
+
+def _sum_sigfigs(m1, e1, m2, e2, subtract: np.ndarray) -> np.ndarray:
+    """sigfigs(n1 ± n2) for non-negative normalized operands (n1 ≥ n2 where subtracting)."""
+    out = np.empty(len(m1), dtype=np.int64)
+    gap = np.abs(e1 - e2)
+    near = gap <= 6
+    if near.any():
+        a1, b1, a2, b2, sub = m1[near], e1[near], m2[near], e2[near], subtract[near]
+        base = np.minimum(b1, b2)
+        x1, x2 = a1 * _POW10[b1 - base], a2 * _POW10[b2 - base]
+        out[near] = _sigfigs(np.where(sub, x1 - x2, x1 + x2))
+    far = ~near
+    if far.any():
+        # The smaller mantissa (≤ 6 digits) sits entirely below the larger one's last digit:
+        # no carry, no trailing zeros, and a borrow only when the larger mantissa is 10^k.
+        hi_is_1 = e1[far] > e2[far]
+        m_hi = np.where(hi_is_1, m1[far], m2[far])
+        d_hi = _digits(m_hi)
+        borrow = subtract[far] & (m_hi == _POW10[d_hi - 1])
+        out[far] = gap[far] + d_hi - borrow
+    return out
+
+
+def cap_mask(settings: Settings, op: np.ndarray, m1, e1, m2, e2) -> np.ndarray:
+    """Vectorized ProblemGenerator.cap_ok for every row.
+
+    Covers +, − and × for any non-negative operands with mantissas of at most
+    six digits, and ÷ for the integer quotients range mode builds.
+    """
+    caps = np.array([settings.max_sig_add, settings.max_sig_sub, settings.max_sig_mul, settings.max_sig_div])
+    sig = np.empty(len(op), dtype=np.int64)
+    dec_ok = np.ones(len(op), dtype=bool)
+    addsub = (op == _ADD) | (op == _SUB)
+    if addsub.any():
+        sig[addsub] = _sum_sigfigs(m1[addsub], e1[addsub], m2[addsub], e2[addsub], op[addsub] == _SUB)
+    mul = op == _MUL
+    if mul.any():
+        sig[mul] = _sigfigs(m1[mul] * m2[mul])
+    div = op == _DIV
+    if div.any():
+        shift = e1[div] - e2[div]
+        num = m1[div] * _POW10[np.maximum(shift, 0)]
+        den = m2[div] * _POW10[np.maximum(-shift, 0)]
+        q, rem = np.divmod(num, den)
+        if (rem != 0).any():
+            raise ValueError("cap_mask only handles integer quotients")
+        q, qe = _strip_zeros(q, np.zeros_like(q))
+        sig[div] = _digits(q)
+        dec_ok[div] = qe >= -1
+    return (sig <= caps[op]) & dec_ok
+
+
+# ---------------- Draws ----------------
+def _choose_ops(settings: Settings, n: int, rng: np.random.Generator) -> np.ndarray:
+    if not settings.ops:
+        raise ValueError("no operator enabled")
+    codes = np.array([OPS.index(op) for op in settings.ops])
+    w = np.array(settings.weights, dtype=float)
+    p = w / w.sum() if w.sum() > 0 else None
+    return rng.choice(codes, size=n, p=p)
+
+
+def _randint(rng, lo_hi, size) -> np.ndarray:
+    return rng.integers(lo_hi[0], lo_hi[1] + 1, size=size, dtype=np.int64)
+
+
+def _range_draw(settings: Settings, op: np.ndarray, rng):
+    k = len(op)
+    addsub = op <= _SUB
+    a = np.where(addsub, _randint(rng, settings.add_A, k), _randint(rng, settings.mul_X, k))
+    b = np.where(addsub, _randint(rng, settings.add_B, k), _randint(rng, settings.mul_Y, k))
+    swap = (op == _SUB) & (a < b)
+    a, b = np.where(swap, b, a), np.where(swap, a, b)
+    a = np.where(op == _DIV, a * b, a)  # integer quotient
+    zeros = np.zeros(k, dtype=np.int64)
+    return a, zeros, b, zeros.copy()
+
+
+def _sigfig_values(sig, exp, k, rng):
+    # Uniform over mantissas with sf digits that don't end in 0: m = 10·t + r, r in 1..9
+    sf = _randint(rng, sig, k)
+    t_lo = np.where(sf >= 2, _POW10[np.maximum(sf - 2, 0)], 0)
+    t = t_lo + np.floor(rng.random(k) * (_POW10[sf - 1] - t_lo)).astype(np.int64)
+    m = 10 * t + rng.integers(1, 10, size=k, dtype=np.int64)
+    return m, _randint(rng, exp, k) - (sf - 1)
+
+
+def _sigfig_draw(settings: Settings, op: np.ndarray, rng):
+    k = len(op)
+    am, ae = _sigfig_values(settings.A_sig, settings.A_exp, k, rng)
+    bm, be = _sigfig_values(settings.B_sig, settings.B_exp, k, rng)
+    a_left = rng.random(k) < 0.5
+    m1, e1 = np.where(a_left, am, bm), np.where(a_left, ae, be)
+    m2, e2 = np.where(a_left, bm, am), np.where(a_left, be, ae)
+    swap = (op == _SUB) & _less(m1, e1, m2, e2)
+    return (np.where(swap, m2, m1), np.where(swap, e2, e1),
+            np.where(swap, m1, m2), np.where(swap, e1, e2))
+
+
+def _division_arrays(sampler: SigfigDivisionSampler):
+    cells, cum, quotients = sampler.tables()
+    res_sets = sorted({c[4] for c in cells})
+    res_table = np.zeros((len(res_sets), 9), dtype=np.int64)
+    for i, rs in enumerate(res_sets):
+        res_table[i, :len(rs)] = rs
+    qns = sorted(quotients)
+    # Every signed quotient of every used mantissa, with one global cumulative weight
+    q_m, q_e, q_cum, g_base, g_w = [], [], [], [], []
+    total = 0.0
+    for qn in qns:
+        qs, ws, _ = quotients[qn]
+        g_base.append(total)
+        g_w.append(sum(ws))
+        for q, w in zip(qs, ws):
+            total += w
+            q_m.append(q.m)
+            q_e.append(q.e)
+            q_cum.append(total)
+    qn_idx = {qn: i for i, qn in enumerate(qns)}
+    col = lambda f, dt=np.int64: np.array([f(c) for c in cells], dtype=dt)  # noqa: E731
+    return {
+        "cum": np.array(cum),
+        "qn": col(lambda c: qn_idx[c[0]]),
+        "d_b": col(lambda c: c[1]),
+        "exp_lo": col(lambda c: c[2][0]),
+        "exp_hi": col(lambda c: c[2][1]),
+        "pe": col(lambda c: c[3]),
+        "res": col(lambda c: res_sets.index(c[4])),
+        "res_len": col(lambda c: len(c[4])),
+        "before": col(lambda c: c[5]),
+        "n": col(lambda c: c[6]),
+        "res_table": res_table,
+        "q_m": np.array(q_m, dtype=np.int64),
+        "q_e": np.array(q_e, dtype=np.int64),
+        "q_cum": np.array(q_cum),
+        "g_base": np.array(g_base),
+        "g_w": np.array(g_w),
+    }
+
+
+def _sigfig_division(settings: Settings, k: int, rng):
+    """Vectorized SigfigDivisionSampler.draw; None when the specs admit no pair."""
+    sampler = SigfigDivisionSampler.for_settings(settings.A_sig, settings.A_exp, settings.B_sig,
+                                                 settings.B_exp, settings.max_sig_div)
+    if not sampler.feasible:
+        return None
+    t = _division_arrays(sampler)
+    cell = np.minimum(np.searchsorted(t["cum"], rng.random(k) * sampler.acceptance, side='right'),
+                      len(t["cum"]) - 1)
+    g = t["before"][cell] + np.floor(rng.random(k) * t["n"][cell]).astype(np.int64)
+    length = t["res_len"][cell]
+    m = t["pe"][cell] * (10 * (g // length) + t["res_table"][t["res"][cell], g % length])
+    exp = t["exp_lo"][cell] + np.floor(rng.random(k) * (t["exp_hi"][cell] - t["exp_lo"][cell] + 1)).astype(np.int64)
+    bm, be = m, exp - (t["d_b"][cell] - 1)
+    grp = t["qn"][cell]
+    qi = np.searchsorted(t["q_cum"], t["g_base"][grp] + rng.random(k) * t["g_w"][grp], side='right')
+    qi = np.minimum(qi, len(t["q_cum"]) - 1)
+    am, ae = _strip_zeros(t["q_m"][qi] * bm, t["q_e"][qi] + be)
+    return am, ae, bm, be
+
+
+# ---------------- Public API ----------------
+def generate_batch(settings: Settings, n: int, rng: Optional[np.random.Generator] = None) -> Batch:
+    """Generate n problems for settings with the scalar generator's rules and caps."""
+    rng = rng if rng is not None else np.random.default_rng()
+    op = _choose_ops(settings, n, rng)
+    m1 = np.ones(n, dtype=np.int64)
+    e1 = np.zeros(n, dtype=np.int64)
+    m2 = np.ones(n, dtype=np.int64)
+    e2 = np.zeros(n, dtype=np.int64)
+    # Rows still waiting for an accepted draw
+    pending = np.arange(n)
+
+    if settings.mode == "sigfigs":
+        div = pending[op[pending] == _DIV]
+        drawn = _sigfig_division(settings, len(div), rng)
+        if drawn is not None:
+            m1[div], e1[div], m2[div], e2[div] = drawn
+            pending = pending[op[pending] != _DIV]
+        else:
+            # No pair meets the specs: integer quotients respecting the cap, like the scalar fallback
+            for _ in range(MAX_ROUNDS):
+                if not len(div):
+                    break
+                b = rng.integers(2, 100, size=len(div), dtype=np.int64)
+                q = rng.integers(1, 100, size=len(div), dtype=np.int64)
+                ok = _sigfigs(q) <= settings.max_sig_div
+                m1[div[ok]], e1[div[ok]] = _strip_zeros(q[ok] * b[ok], np.zeros(ok.sum(), dtype=np.int64))
+                m2[div[ok]], e2[div[ok]] = _strip_zeros(b[ok], np.zeros(ok.sum(), dtype=np.int64))
+                div = div[~ok]
+            op[div] = _ADD  # never accepted: 1 + 1, as generate() does
+            pending = pending[op[pending] != _DIV]
+        draw = _sigfig_draw
+    else:
+        draw = _range_draw
+
+    for _ in range(MAX_ROUNDS):
+        if not len(pending):
+            break
+        a, ae, b, be = draw(settings, op[pending], rng)
+        a, ae = _strip_zeros(a, ae)
+        b, be = _strip_zeros(b, be)
+        ok = cap_mask(settings, op[pending], a, ae, b, be)
+        # Range mode keeps the last rejected draw; sig-figs mode only stores accepted ones
+        keep = ok if settings.mode == "sigfigs" else np.ones(len(pending), dtype=bool)
+        rows = pending[keep]
+        m1[rows], e1[rows], m2[rows], e2[rows] = a[keep], ae[keep], b[keep], be[keep]
+        pending = pending[~ok]
+
+    if settings.mode == "sigfigs" and len(pending):
+        op[pending] = _ADD
+        m1[pending] = m2[pending] = 1
+        e1[pending] = e2[pending] = 0
+    return Batch(op.astype(np.uint8), m1, e1, m2, e2)
@@ -0,0 +1,98 @@
+"""Can the caps be met? Per-operator problem-space report for a Settings snapshot.
+
+For every enabled operator: the share of raw draws that meet the
+max-solution-sig-figs cap, how many draws a problem costs on average and
+how often a problem gives up and serves a pair that breaks the caps.
+
+Range mode and sig-figs division are counted exactly (``RangePairIndex``
+and ``SigfigDivisionSampler`` already enumerate their spaces) and draw in
+one go. Sig-figs +, −, × still use the rejection loop, so their acceptance
+is estimated from SAMPLES seeded attempts of that same loop.
+"""
+import random
+from dataclasses import replace
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from generator import SIGFIG_ATTEMPTS, ProblemGenerator, Settings, sigfigs
+from stats import OP_SYMBOLS
+
+SAMPLES = 2000
+MAX_FALLBACK = 0.01  # an operator that gives up on more than 1% of problems counts as infeasible
+
+
+class OpFeasibility(NamedTuple):
+    op: str
+    acceptance: float       # share of raw draws within the caps
+    exact: bool             # counted, not sampled
+    space: Optional[int]    # number of distinct valid draws, when counted
+    attempts: float         # expected draws per problem
+    fallback: float         # chance a problem breaks the caps
+
+    @property
+    def feasible(self) -> bool:
+        return self.fallback <= MAX_FALLBACK
+
+
+def _rejection(p: float) -> Tuple[float, float]:
+    """(expected attempts, chance of giving up) for the sig-figs loop at acceptance p."""
+    if p <= 0:
+        return float(SIGFIG_ATTEMPTS), 1.0
+    miss = (1 - p) ** SIGFIG_ATTEMPTS
+    return (1 - miss) / p, miss
+
+
+@lru_cache(maxsize=32)
+def analyze(settings: Settings, samples: int = SAMPLES) -> Tuple[OpFeasibility, ...]:
+    """One entry per enabled operator, in OPS order. Cached per snapshot, so a game start after a save is free."""
+    gen = ProblemGenerator(settings)
+    out = []
+    for op in settings.ops:
+        if settings.mode == "range":
+            n, total = gen.range_space(op), gen.range_draws(op)
+            out.append(OpFeasibility(op, n / total if total else 0.0, True, n, 1.0, 0.0 if n else 1.0))
+        elif op == '/' and gen.division_acceptance() > 0:
+            out.append(OpFeasibility(op, gen.division_acceptance(), True, None, 1.0, 0.0))
+        elif op == '/':
+            # Integer-quotient fallback: q uniform in 1..99, kept when its sig figs fit the cap
+            ok = sum(1 for q in range(1, 100) if sigfigs(q) <= settings.max_sig_div)
+            out.append(OpFeasibility(op, ok / 99, True, None, *_rejection(ok / 99)))
+        else:
+            rng = random.Random(0)
+            hits = sum(1 for _ in range(samples) if gen.sigfig_attempt(op, rng) is not None)
+            # With no hit in the sample, cost it at the 95% upper bound so a tiny space isn't called empty
+            p = hits / samples if hits else _upper_bound(samples)
+            out.append(OpFeasibility(op, hits / samples, False, None, *_rejection(p)))
+    return tuple(out)
+
+
+def playable(settings: Settings, report: Tuple[OpFeasibility, ...]) -> Settings:
+    """settings without its infeasible operators; unchanged if that would leave none."""
+    keep = {r.op for r in report if r.feasible}
+    if not keep or len(keep) == len(settings.ops):
+        return settings
+    pairs = [(op, w) for op, w in zip(settings.ops, settings.weights) if op in keep]
+    return replace(settings, ops=tuple(op for op, _ in pairs), weights=tuple(w for _, w in pairs))
+
+
+def _upper_bound(samples: int) -> float:
+    """95% upper bound on the acceptance when none of `samples` attempts succeeded."""
+    return 1 - 0.05 ** (1 / samples)
+
+
+def describe(report: Tuple[OpFeasibility, ...], samples: int = SAMPLES) -> str:
+    """One line per operator that is infeasible or costs more than one draw; "" when all is well."""
+    none_ok = all(not r.feasible for r in report)
+    lines = []
+    for r in report:
+        sym = OP_SYMBOLS[r.op]
+        share = f"{r.acceptance:.1%} of draws fit" if r.acceptance else \
+            ("no draw fits" if r.exact else f"none of {samples} sampled draws fit")
+        if not r.feasible:
+            lines.append(f"{sym} can't meet its cap ({share}, {r.fallback:.0%} of problems would break it)"
+                         + ("" if none_ok else " and is skipped"))
+        elif r.attempts >= 2:
+            lines.append(f"{sym}: {share} the cap, ~{r.attempts:.0f} tries per problem")
+    if none_ok and report:
+        lines.append("No operation can meet its cap, so problems will break the caps")
+    return "\n".join(lines)
@@ -0,0 +1,68 @@
+"""Monotonic game clock.
+
+The game ends at a deadline fixed when it starts, so a late or skipped
+display tick only delays the redraw, never the end of the game.
+``finish`` reports how far the actual end landed from the nominal length.
+"""
+import time
+from typing import Optional
+
+TICK_MS = 100  # display refresh interval
+
+
+class GameClock:
+    def __init__(self, clock=time.monotonic_ns):
+        self._clock = clock
+        self.duration_ns = 0
+        self.start_ns: Optional[int] = None
+        self.deadline_ns: Optional[int] = None
+        self.ticks = 0
+        self.max_gap_ns = 0
+        self._last_tick_ns = 0
+
+    @property
+    def running(self) -> bool:
+        return self.deadline_ns is not None
+
+    def start(self, seconds: float):
+        now = self._clock()
+        self.duration_ns = int(seconds * 1_000_000_000)
+        self.start_ns = self._last_tick_ns = now
+        self.deadline_ns = now + self.duration_ns
+        self.ticks = 0
+        self.max_gap_ns = 0
+
+    def remaining_ns(self) -> int:
+        if self.deadline_ns is None:
+            return 0
+        return max(0, self.deadline_ns - self._clock())
+
+    def expired(self) -> bool:
+        return self.deadline_ns is not None and self._clock() >= self.deadline_ns
+
+    def tick(self) -> int:
+        """Record a display tick; returns the nanoseconds left."""
+        now = self._clock()
+        self.ticks += 1
+        self.max_gap_ns = max(self.max_gap_ns, now - self._last_tick_ns)
+        self._last_tick_ns = now
+        return max(0, self.deadline_ns - now) if self.deadline_ns is not None else 0
+
+    def finish(self) -> dict:
+        """Stop the clock and return the session's timing; drift is actual minus nominal."""
+        end = self._clock()
+        actual = end - self.start_ns
+        self.deadline_ns = None
+        return {
+            "nominal_s": self.duration_ns / 1e9,
+            "actual_s": round(actual / 1e9, 6),
+            "drift_ms": round((actual - self.duration_ns) / 1e6, 3),
+            "ticks": self.ticks,
+            "max_tick_gap_ms": round(self.max_gap_ns / 1e6, 3),
+        }
+
+
+def format_remaining(ns: int) -> str:
+    # Round up so the display reads 0.0 only once time is really out
+    tenths = -(-ns // 100_000_000)
+    return f"Time left: {tenths // 10}.{tenths % 10} s"
@@ -0,0 +1,625 @@
+"""Qt-free problem generation.
+
+Everything here works from a frozen ``Settings`` snapshot (built once from the
+same dict ``ArithmeticTrainer._collect_preferences`` produces), so it can be
+driven by the GUI, by scripts and by benchmarks without a QApplication.
+"""
+import hashlib
+import json
+import random
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from decimal import Decimal, getcontext, ROUND_HALF_UP
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from numeric import Num
+from preferences import normalize_prefs
+
+# Exact decimal math
+getcontext().prec = 100
+getcontext().rounding = ROUND_HALF_UP
+
+OPS = ('+', '-', '*', '/')
+
+# Sig-figs +, −, × (and ÷ with no exact sampler) retry this often, then give up
+SIGFIG_ATTEMPTS = 800
+
+
+# ---------------- Formatting memo ----------------
+# Range mode formats the same few hundred operands and answers over and over,
+# so formatted numbers, answer strings and parsed inputs sit in bounded LRU
+# tables keyed by exact value ((m, e), or the typed text). Sig-figs problems
+# rarely repeat and skip the number tables (see Problem.memo); typed input is
+# always looked up, and every table is bounded.
+NUM_CACHE_SIZE = 4096
+ANSWER_CACHE_SIZE = 4096
+INPUT_CACHE_SIZE = 1024
+INPUT_KEY_MAX = 40  # longer typed text is parsed but not cached
+
+
+@lru_cache(maxsize=NUM_CACHE_SIZE)
+def _num_text(m: int, e: int) -> str:
+    return str(Num._raw(m, e))
+
+
+@lru_cache(maxsize=ANSWER_CACHE_SIZE)
+def _answer_strings(m: int, e: int) -> Tuple[str, FrozenSet[str]]:
+    answer = Num._raw(m, e)
+    return str(answer), answer_forms(answer)
+
+
+def _parse_input_uncached(text: str) -> Optional[Tuple[Num, str]]:
+    try:
+        user = Num.parse(text)
+    except ValueError:
+        return None
+    return user, str(user)
+
+
+_parse_input_cached = lru_cache(maxsize=INPUT_CACHE_SIZE)(_parse_input_uncached)
+
+
+def parse_input(text: str) -> Optional[Tuple[Num, str]]:
+    """(value, canonical string) of a typed answer, or None if it isn't a number."""
+    if len(text) > INPUT_KEY_MAX:
+        return _parse_input_uncached(text)
+    return _parse_input_cached(text)
+
+
+def format_cache_stats() -> Dict[str, dict]:
+    """Hit counters for the formatting tables."""
+    out = {}
+    for name, fn in (("numbers", _num_text), ("answers", _answer_strings), ("inputs", _parse_input_cached)):
+        info = fn.cache_info()
+        lookups = info.hits + info.misses
+        out[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize,
+                     "hit_rate": round(info.hits / lookups, 4) if lookups else None}
+    return out
+
+
+def format_cache_clear():
+    for fn in (_num_text, _answer_strings, _parse_input_cached):
+        fn.cache_clear()
+
+
+# ---------------- Decimal helpers ----------------
+# Each helper takes the Num fast path and keeps the Decimal path for everything else
+def format_num(v) -> str:
+    if isinstance(v, Num):
+        return str(v)
+    d = Decimal(v) if not isinstance(v, Decimal) else v
+    if d == d.to_integral_value():
+        return str(d.quantize(Decimal('1')))
+    s = format(d.normalize(), 'f')
+    if '.' in s:
+        s = s.rstrip('0').rstrip('.')
+    return s
+
+
+def sigfigs(d) -> int:
+    if isinstance(d, Num):
+        return d.sigfigs()
+    if not isinstance(d, Decimal):
+        d = Decimal(d)
+    if d.is_zero():
+        return 1
+    dn = d.normalize()
+    return len(dn.as_tuple().digits)
+
+
+def decimal_places_leq_one(x) -> bool:
+    if isinstance(x, Num):
+        return x.decimal_places_leq_one()
+    if x == x.to_integral_value():
+        return True
+    try:
+        return x == x.quantize(Decimal('0.1'))
+    except Exception:
+        return False
+
+
+def norm(a: int, b: int):
+    return (a, b) if a <= b else (b, a)
+
+
+def compute_answer(n1, n2, op):
+    if isinstance(n1, Num) and isinstance(n2, Num):
+        if op == '+': return n1 + n2
+        if op == '-': return n1 - n2
+        if op == '*': return n1 * n2
+        if op == '/': return n1 / n2
+        raise ValueError("Unknown operator")
+    d1, d2 = (n1 if isinstance(n1, Decimal) else Decimal(n1)), (n2 if isinstance(n2, Decimal) else Decimal(n2))
+    if op == '+': return d1 + d2
+    if op == '-': return d1 - d2
+    if op == '*': return d1 * d2
+    if op == '/': return d1 / d2
+    raise ValueError("Unknown operator")
+
+
+def round_to_sigfigs(x: Decimal, sig: int) -> Decimal:
+    if x.is_zero():
+        return Decimal('0')
+    shift = - (x.adjusted())
+    quant = Decimal(1).scaleb(shift + (sig - 1))
+    y = (x * quant).to_integral_value(rounding=ROUND_HALF_UP)
+    return y / quant
+
+
+def problem_text(n1, op: str, n2) -> str:
+    return f"{format_num(n1)} {op} {format_num(n2)}"
+
+
+# ---------------- Settings snapshot ----------------
+@dataclass(frozen=True)
+class Settings:
+    """Everything the generator needs, with ranges normalized to (lo, hi)."""
+    mode: str = "range"
+    ops: Tuple[str, ...] = OPS                        # enabled operators, in OPS order
+    weights: Tuple[int, ...] = (3, 3, 3, 3)           # parallel to ops
+    add_A: Tuple[int, int] = (2, 100)
+    add_B: Tuple[int, int] = (2, 100)
+    mul_X: Tuple[int, int] = (2, 12)
+    mul_Y: Tuple[int, int] = (2, 100)
+    A_sig: Tuple[int, int] = (2, 3)
+    A_exp: Tuple[int, int] = (-2, 3)
+    B_sig: Tuple[int, int] = (2, 3)
+    B_exp: Tuple[int, int] = (-2, 3)
+    max_sig_add: int = 5
+    max_sig_sub: int = 5
+    max_sig_mul: int = 4
+    max_sig_div: int = 4
+    adaptive: bool = False                            # range mode: target weak cells (adaptive.py)
+
+    @classmethod
+    def from_prefs(cls, prefs: dict) -> "Settings":
+        """Build a snapshot from a preferences dict, clamped like the spinboxes (see normalize_prefs)."""
+        mode = prefs.get("mode", "range")
+        p = normalize_prefs(dict(prefs, mode=mode if mode in ("range", "sigfigs") else "range"))
+        if p is None:
+            raise ValueError("unusable preferences")
+        ranges, sfs, maxsol = p["ranges"], p["sigfigs"], p["max_solution_sigfigs"]
+        ops = tuple(op for op in OPS if p["ops"][op])
+        return cls(
+            mode=p["mode"],
+            ops=ops,
+            weights=tuple(p["weights"][op] for op in ops),
+            add_A=norm(*ranges["add_A"]),
+            add_B=norm(*ranges["add_B"]),
+            mul_X=norm(*ranges["mul_X"]),
+            mul_Y=norm(*ranges["mul_Y"]),
+            A_sig=norm(*sfs["A_sig"]),
+            A_exp=norm(*sfs["A_exp"]),
+            B_sig=norm(*sfs["B_sig"]),
+            B_exp=norm(*sfs["B_exp"]),
+            max_sig_add=maxsol["+"],
+            max_sig_sub=maxsol["-"],
+            max_sig_mul=maxsol["*"],
+            max_sig_div=maxsol["/"],
+            adaptive=p["toggles"]["adaptive"],
+        )
+
+    def digest(self) -> str:
+        """Short hash that identifies these settings across sessions."""
+        d = asdict(self)
+        if not d["adaptive"]:
+            del d["adaptive"]  # keep digests logged before the flag existed valid
+        return hashlib.sha1(json.dumps(d, sort_keys=True).encode()).hexdigest()[:12]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Settings":
+        """Inverse of to_dict (JSON turns the tuples into lists)."""
+        return cls(**{k: tuple(v) if isinstance(v, list) else v for k, v in d.items()
+                      if k in cls.__dataclass_fields__})
+
+    def max_sig(self, op: str) -> int:
+        if op == '+': return self.max_sig_add
+        if op == '-': return self.max_sig_sub
+        if op == '*': return self.max_sig_mul
+        if op == '/': return self.max_sig_div
+        raise ValueError("Unknown operator")
+
+
+def answer_forms(answer: Num) -> FrozenSet[str]:
+    """Every string a typed answer can match verbatim: the canonical form, plus ".5" for "0.5"."""
+    s = str(answer)
+    if s.startswith('0.'):
+        return frozenset((s, s[1:]))
+    if s.startswith('-0.'):
+        return frozenset((s, '-' + s[2:]))
+    return frozenset((s,))
+
+
+class Problem(NamedTuple):
+    """A problem with its answer and display strings worked out up front."""
+    op: str
+    n1: Num
+    n2: Num
+    answer: Num
+    text: str
+    answer_text: str
+    forms: FrozenSet[str]
+
+    @classmethod
+    def of(cls, op: str, n1: Num, n2: Num) -> "Problem":
+        answer = compute_answer(n1, n2, op)
+        return cls(op, n1, n2, answer, problem_text(n1, op, n2), str(answer), answer_forms(answer))
+
+    @classmethod
+    def memo(cls, op: str, n1: Num, n2: Num) -> "Problem":
+        """``of`` through the formatting tables. Only pays off where values repeat (range mode):
+        a table miss costs more than formatting from scratch."""
+        answer = compute_answer(n1, n2, op)
+        text, forms = _answer_strings(answer.m, answer.e)
+        return cls(op, n1, n2, answer, f"{_num_text(n1.m, n1.e)} {op} {_num_text(n2.m, n2.e)}", text, forms)
+
+    def grade(self, text: str) -> Optional[Tuple[bool, str]]:
+        """(correct, canonical form of the typed number), or None if text isn't a number. Exact, never rounded."""
+        text = text.strip()
+        if text in self.forms:
+            # Precomputed fast path: no parsing or formatting for a right answer
+            return True, self.answer_text
+        parsed = parse_input(text)
+        if parsed is None:
+            return None
+        return parsed[0] == self.answer, parsed[1]
+
+
+# ---------------- Sig-figs division sampler ----------------
+# The old rejection loop drew a divisor b = m·10^e (m has sf digits and does not
+# end in 0), a quotient q from _rand_quotient_max_one_decimal, and kept a = q·b
+# only when sigfigs(a) hit the target. sigfigs(a) depends on the mantissas
+# alone: the raw digit count of qn·m (one of two values, split at a threshold
+# on m) minus its trailing zeros, min(v2, v5). As m never ends in 0 it carries
+# at most one of the factors 2 and 5, so the divisor mantissas fall into a few
+# classes "p^e·r with r mod 10 in R" that can be counted and indexed in O(1).
+# Weighting every (quotient mantissa, divisor digits, class, branch) cell by
+# its probability under the old draw reproduces the old accepted distribution
+# exactly, with no rejection at all.
+
+_ALL = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+_NOT5 = (1, 2, 3, 4, 6, 7, 8, 9)
+_ODD = (1, 3, 5, 7, 9)
+_COPRIME = (1, 3, 7, 9)
+
+
+def _valuation(n: int, p: int) -> int:
+    e = 0
+    while n % p == 0:
+        n //= p
+        e += 1
+    return e
+
+
+def _upto(x: int, residues) -> int:
+    # How many r in [0, x] have r % 10 in residues (0 is never a member)
+    return (x // 10) * len(residues) + sum(1 for s in residues if s <= x % 10)
+
+
+def _quotient_table():
+    """qn -> (signed quotients with mantissa qn, their weights, total probability)."""
+    probs = {}
+    for v in range(-99, 100):
+        q = Num(v or 1)
+        probs[q] = probs.get(q, 0.0) + 0.5 / 199
+    for k in range(-990, 991):
+        if k % 10 == 0:
+            k += 1
+        q = Num(k, -1)
+        probs[q] = probs.get(q, 0.0) + 0.5 / 1981
+    groups = {}
+    for q, p in probs.items():
+        qs, ws = groups.setdefault(abs(q.m), ([], []))
+        qs.append(q)
+        ws.append(p)
+    return {qn: (tuple(qs), tuple(ws), sum(ws)) for qn, (qs, ws) in groups.items()}
+
+
+def _divisor_classes(qn: int):
+    """(p^e, residues of r, trailing zeros of qn·m) partitioning every m not ending in 0."""
+    a, b = _valuation(qn, 2), _valuation(qn, 5)
+    if a:  # qn·m loses min(a, v5(m)) zeros
+        return [(1, _NOT5, 0)] + [(5 ** j, _COPRIME, j) for j in range(1, a)] + [(5 ** a, _ODD, a)]
+    if b:  # qn·m loses min(b, v2(m)) zeros
+        return [(1, _ODD, 0)] + [(2 ** i, _COPRIME, i) for i in range(1, b)] + [(2 ** b, _NOT5, b)]
+    return [(1, _ALL, 0)]
+
+
+@lru_cache(maxsize=None)
+def _division_tables():
+    """(quotient table, divisor classes by qn); built by the first sig-figs division sampler, not at import."""
+    quotients = _quotient_table()
+    return quotients, {qn: _divisor_classes(qn) for qn in quotients}
+
+
+class DivisionTables(NamedTuple):
+    """What SigfigDivisionSampler draws from, for samplers that redo its draw (see bulk.py)."""
+    # (quotient mantissa, divisor digits, divisor exponent range, 2/5 part, residues, draws before, draws)
+    cells: Tuple[tuple, ...]
+    cum: Tuple[float, ...]  # cumulative cell weights; the last one is the acceptance
+    quotients: Dict[int, tuple]  # quotient mantissa -> (signed quotients, weights, probability)
+
+
+class SigfigDivisionSampler:
+    """Constructive sig-figs division: every draw is valid, latency is one bisect."""
+
+    def __init__(self, A_sig, A_exp, B_sig, B_exp, max_sig_div: int):
+        quotients, classes = _division_tables()
+        cells = []
+        weights = []
+        # (left operand spec, divisor spec) — each side was picked with probability 1/2
+        for (l_lo, l_hi), (d_lo, d_hi), div_exp in ((A_sig, B_sig, B_exp), (B_sig, A_sig, A_exp)):
+            p_side = 0.5 / ((l_hi - l_lo + 1) * (d_hi - d_lo + 1))
+            for d_b in range(d_lo, d_hi + 1):
+                m_lo, m_hi = 10 ** (d_b - 1), 10 ** d_b - 1
+                n_mant = 9 if d_b == 1 else 81 * 10 ** (d_b - 2)
+                for qn, (_, _, p_q) in quotients.items():
+                    d_q = len(str(qn))
+                    if d_q > max_sig_div:
+                        continue
+                    t = -(-10 ** (d_q + d_b - 1) // qn)  # smallest m where qn·m gains a digit
+                    for lo, hi, raw in ((m_lo, min(t - 1, m_hi), d_q + d_b - 1), (max(t, m_lo), m_hi, d_q + d_b)):
+                        if lo > hi:
+                            continue
+                        for pe, res, zeros in classes[qn]:
+                            if not (l_lo <= raw - zeros <= l_hi):
+                                continue
+                            r_lo, r_hi = -(-lo // pe), hi // pe
+                            n = _upto(r_hi, res) - _upto(r_lo - 1, res) if r_hi >= r_lo else 0
+                            if n:
+                                cells.append((qn, d_b, div_exp, pe, res, _upto(r_lo - 1, res), n))
+                                weights.append(p_side * p_q * n / n_mant)
+        self._quotients = quotients
+        self._cells = cells
+        self._cum = list(accumulate(weights))
+        # Chance that one attempt of the old rejection loop succeeded
+        self.acceptance = self._cum[-1] if cells else 0.0
+
+    @classmethod
+    @lru_cache(maxsize=8)
+    def for_settings(cls, A_sig, A_exp, B_sig, B_exp, max_sig_div: int) -> "SigfigDivisionSampler":
+        return cls(A_sig, A_exp, B_sig, B_exp, max_sig_div)
+
+    @property
+    def feasible(self) -> bool:
+        return bool(self._cells)
+
+    def tables(self) -> DivisionTables:
+        """Read-only copies of the cells and weights, with the quotient mantissas they use."""
+        return DivisionTables(tuple(self._cells), tuple(self._cum),
+                              {qn: self._quotients[qn] for qn in sorted({c[0] for c in self._cells})})
+
+    def draw(self, rng=random) -> Tuple[Num, Num]:
+        """Return (a, b) with a / b exact, ≤1 decimal place and both specs honored."""
+        i = bisect_right(self._cum, rng.random() * self.acceptance)
+        qn, d_b, div_exp, pe, res, before, n = self._cells[min(i, len(self._cells) - 1)]
+        g = before + rng.randrange(n)
+        m = pe * (10 * (g // len(res)) + res[g % len(res)])
+        k = rng.randint(*div_exp)
+        b = Num(m, k - (d_b - 1))
+        qs, ws, _ = self._quotients[qn]
+        q = qs[0] if len(qs) == 1 else rng.choices(qs, weights=ws, k=1)[0]
+        return q * b, b
+
+
+# ---------------- Range-mode pair index ----------------
+def _int_sigfigs(n: int) -> int:
+    return len(str(abs(n)).rstrip('0')) or 1
+
+
+def _range_draws(op: str, add_A, add_B, mul_X, mul_Y):
+    """Every (n1, n2) the range-mode draw can produce for op, one per (randint, randint) outcome."""
+    if op in ('+', '-'):
+        for a in range(add_A[0], add_A[1] + 1):
+            for b in range(add_B[0], add_B[1] + 1):
+                yield (b, a) if op == '-' and a < b else (a, b)
+    else:
+        for x in range(mul_X[0], mul_X[1] + 1):
+            for y in range(mul_Y[0], mul_Y[1] + 1):
+                yield (x * y, y) if op == '/' else (x, y)
+
+
+class RangePairIndex:
+    """All cap-respecting range-mode draws per operator (≤10k each: operands are 1–100).
+
+    Drawing uniformly from the index gives the same distribution the rejection
+    loop had once it succeeded, in a single ``random.choice``.
+    """
+
+    def __init__(self, add_A, add_B, mul_X, mul_Y, caps):
+        self._ranges = (add_A, add_B, mul_X, mul_Y)
+        self.pairs = {}
+        self.totals = {}
+        for op, cap in zip(OPS, caps):
+            draws = list(_range_draws(op, add_A, add_B, mul_X, mul_Y))
+            if op == '+':
+                kept = [pr for pr in draws if _int_sigfigs(pr[0] + pr[1]) <= cap]
+            elif op == '-':
+                kept = [pr for pr in draws if _int_sigfigs(pr[0] - pr[1]) <= cap]
+            elif op == '*':
+                kept = [pr for pr in draws if _int_sigfigs(pr[0] * pr[1]) <= cap]
+            else:  # integer quotient, so ≤1 decimal place holds trivially
+                kept = [pr for pr in draws if _int_sigfigs(pr[0] // pr[1]) <= cap]
+            self.pairs[op] = kept
+            self.totals[op] = len(draws)
+
+    @classmethod
+    @lru_cache(maxsize=8)
+    def for_settings(cls, add_A, add_B, mul_X, mul_Y, caps) -> "RangePairIndex":
+        return cls(add_A, add_B, mul_X, mul_Y, caps)
+
+    def count(self, op: str) -> int:
+        """Exact number of valid (n1, n2) draws for op."""
+        return len(self.pairs[op])
+
+    def draw(self, op: str, rng=random) -> Tuple[Num, Num]:
+        pairs = self.pairs[op]
+        if not pairs:  # caps unreachable: serve an unfiltered draw, as the rejection loop did
+            pairs = list(_range_draws(op, *self._ranges))
+        n1, n2 = rng.choice(pairs)
+        return Num(n1), Num(n2)
+
+
+# ---------------- Generator ----------------
+class ProblemGenerator:
+    """Problems from a Settings snapshot; with a seeded ``rng`` the stream is reproducible."""
+
+    def __init__(self, settings: Settings, weakness=None, rng: Optional[random.Random] = None):
+        self.settings = settings
+        self.rng = rng if rng is not None else random.Random()
+        # adaptive.WeaknessModel, consulted only for adaptive range mode
+        self._weakness = weakness if settings.adaptive and settings.mode == "range" else None
+        self._weakness_ready = False
+        # Operator draw is fixed for the lifetime of the snapshot
+        positive = [(op, w) for op, w in zip(settings.ops, settings.weights) if w > 0]
+        self._ops = tuple(op for op, _ in positive) or settings.ops
+        self._weights = tuple(w for _, w in positive) if positive else None
+        # Built on first use, shared across generators with the same settings
+        self._index = None
+        self._sampler = None
+        self.counters = None  # profiling.HotPathCounters while a game is profiled
+
+    # Random exact sig-fig value (avoid mantissas ending in 0 so count is stable after normalize)
+    @staticmethod
+    def _rand_sigfig_value(sf_range, exp_range, rng=random) -> Num:
+        sf = rng.randint(*sf_range)
+        k = rng.randint(*exp_range)
+
+        m_lo = 10 ** (sf - 1)
+        m_hi = 10 ** sf - 1
+        while True:
+            m = rng.randint(m_lo, m_hi)
+            if m % 10 != 0 or sf == 1:
+                break
+
+        return Num(m, k - (sf - 1))
+
+    def _range_index(self) -> RangePairIndex:
+        if self._index is None:
+            st = self.settings
+            caps = (st.max_sig_add, st.max_sig_sub, st.max_sig_mul, st.max_sig_div)
+            self._index = RangePairIndex.for_settings(st.add_A, st.add_B, st.mul_X, st.mul_Y, caps)
+        return self._index
+
+    def range_space(self, op: str) -> int:
+        """Exact number of valid (n1, n2) range-mode draws for op under the current caps."""
+        return self._range_index().count(op)
+
+    def range_draws(self, op: str) -> int:
+        """Number of range-mode draws for op before the caps, valid or not."""
+        return self._range_index().totals[op]
+
+    def division_acceptance(self) -> float:
+        """Chance one attempt of the old sig-figs ÷ rejection loop succeeded; 0.0 when no pair fits the specs."""
+        sampler = self._division_sampler()
+        return sampler.acceptance if sampler.feasible else 0.0
+
+    def _division_sampler(self) -> SigfigDivisionSampler:
+        if self._sampler is None:
+            st = self.settings
+            self._sampler = SigfigDivisionSampler.for_settings(st.A_sig, st.A_exp, st.B_sig, st.B_exp, st.max_sig_div)
+        return self._sampler
+
+    @staticmethod
+    def _rand_quotient_max_one_decimal(rng=random) -> Num:
+        # Ensures finite decimal with ≤1 decimal place (k is never 0, so |q| ≥ 0.1)
+        if rng.random() < 0.5:
+            return Num(rng.randint(-99, 99) or 1)
+        else:
+            k = rng.randint(-990, 990)
+            if k % 10 == 0:
+                k += 1
+            return Num(k, -1)
+
+    def choose_operator(self) -> Optional[str]:
+        if not self._ops:
+            return None
+        if self._weights is None:
+            return self.rng.choice(self._ops)
+        return self.rng.choices(self._ops, weights=self._weights, k=1)[0]
+
+    def cap_ok(self, op: str, result: Num) -> bool:
+        s = sigfigs(result)
+        if op == '/':
+            return s <= self.settings.max_sig_div and decimal_places_leq_one(result)
+        return s <= self.settings.max_sig(op)
+
+    def generate(self) -> Optional[Problem]:
+        """Return the next problem, or None when no operator is enabled."""
+        op = self.choose_operator()
+        if not op:
+            return None
+        st = self.settings
+        rng = self.rng
+        if st.mode == "range":
+            if self._weakness is not None:
+                if not self._weakness_ready:
+                    self._weakness.attach(self._range_index())
+                    self._weakness_ready = True
+                pair = self._weakness.draw(op, rng)
+                if pair is not None:
+                    if self.counters is not None:
+                        self.counters.generated("adaptive", op, 1, False)
+                    return Problem.memo(op, Num(pair[0]), Num(pair[1]))
+            if self.counters is not None:
+                # An empty index serves an unfiltered pair, which breaks the cap
+                self.counters.generated("range", op, 1, not self._range_index().count(op))
+            return Problem.memo(op, *self._range_index().draw(op, rng))
+
+        last_pair = None
+        draws = 0
+        for draws in range(1, SIGFIG_ATTEMPTS + 1):  # try hard to honor every preference
+            last_pair = self.sigfig_attempt(op, rng)
+            if last_pair is not None:
+                break
+        if self.counters is not None:
+            self.counters.generated("sigfigs", op, draws, last_pair is None)
+
+        # Use the last acceptable pair
+        if last_pair is None:
+            return Problem.of('+', Num(1), Num(1))
+        return Problem.of(op, *last_pair)
+
+    def sigfig_attempt(self, op: str, rng) -> Optional[Tuple[Num, Num]]:
+        """One draw of the sig-figs rejection loop: an (n1, n2) within the caps, or None."""
+        st = self.settings
+        if op == '/':
+            sampler = self._division_sampler()
+            if sampler.feasible:
+                return sampler.draw(rng)
+            # No (divisor, quotient) pair meets the specs: simple integer quotient respecting caps
+            n2 = Num(rng.randint(2, 99))
+            q = Num(rng.randint(1, 99))
+            n1 = n2 * q
+            return (n1, n2) if self.cap_ok('/', n1 / n2) else None
+
+        # +, -, *
+        use_A_for_left = rng.choice([True, False])
+        a_val = self._rand_sigfig_value(st.A_sig, st.A_exp, rng)
+        b_val = self._rand_sigfig_value(st.B_sig, st.B_exp, rng)
+        n1, n2 = (a_val, b_val) if use_A_for_left else (b_val, a_val)
+        if op == '-' and n1 < n2:
+            n1, n2 = n2, n1
+        return (n1, n2) if self.cap_ok(op, compute_answer(n1, n2, op)) else None
+
+
+class ReplayGenerator:
+    """Serves a recorded problem list in order, then carries on from ``fallback``."""
+
+    def __init__(self, problems, fallback: ProblemGenerator):
+        self.settings = fallback.settings
+        self._problems = iter(problems)
+        self._fallback = fallback
+
+    @staticmethod
+    def parse(recorded) -> List[Problem]:
+        """[[op, n1, n2], ...] as written to the session log -> Problems."""
+        return [Problem.of(op, Num.parse(n1), Num.parse(n2)) for op, n1, n2 in recorded]
+
+    def generate(self) -> Optional[Problem]:
+        return next(self._problems, None) or self._fallback.generate()
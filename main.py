@@ -1,101 +1,334 @@
-import sys
-import json
-import random
-from decimal import Decimal, getcontext, ROUND_HALF_UP
-from pathlib import Path
+import time
 
-from PyQt5.QtWidgets import (
+# Taken before any other import, Qt included, so the startup report can show what importing costs
+_T_IMPORT = time.perf_counter()
+
+import sys  # noqa: E402
+import json  # noqa: E402
+import copy  # noqa: E402
+import random  # noqa: E402
+from decimal import Decimal  # noqa: E402
+from typing import TYPE_CHECKING  # noqa: E402
+
+from PyQt5.QtWidgets import (  # noqa: E402
     QApplication, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton,
     QHBoxLayout, QFormLayout, QSpinBox, QCheckBox, QFrame, QSlider,
-    QRadioButton, QTableWidget, QTableWidgetItem, QAbstractItemView, QAbstractScrollArea
+    QRadioButton, QTableView, QHeaderView, QAbstractItemView, QAbstractScrollArea, QStyle,
+    QComboBox, QInputDialog
 )
-from PyQt5.QtCore import QTimer, Qt
-from PyQt5.QtGui import QBrush, QColor
+from PyQt5.QtCore import QTimer, Qt, QAbstractTableModel, QModelIndex, pyqtSignal  # noqa: E402
+from PyQt5.QtGui import QBrush, QColor, QPainter  # noqa: E402
 
-# Exact decimal math
-getcontext().prec = 100
-getcontext().rounding = ROUND_HALF_UP
+from generator import (  # noqa: E402
+    Settings, ProblemGenerator, ReplayGenerator, format_num, sigfigs, decimal_places_leq_one, norm,
+    compute_answer, round_to_sigfigs,
+)
+from attempt_log import AttemptLog, read_attempts  # noqa: E402
+from batch_writer import BatchWriter  # noqa: E402
+from game_clock import GameClock, TICK_MS, format_remaining  # noqa: E402
+from numeric import Num  # noqa: E402
+from paths import (  # noqa: E402
+    prefs_path as _prefs_path, attempts_path as _attempts_path,
+    sessions_path as _sessions_path, weakness_path as _weakness_path, startup_path as _startup_path,
+    profile_path as _profile_path, results_path as _results_path,
+)
+from prefetch import ProblemPrefetcher  # noqa: E402
+from preferences import PreferencesStore, atomic_write, default_prefs, normalize_prefs  # noqa: E402
+from startup import process_start, report_requested, append_report  # noqa: E402
+from stats import OP_SYMBOLS, SessionStats, format_latency_summary, format_session_stats, latency_summary  # noqa: E402
+
+# results (sqlite3), adaptive, feasibility and profiling are imported where first used, off the
+# start-up path
+if TYPE_CHECKING:
+    from results import ResultsStore
+
+def _argv_int(flag: str):
+    """Integer value following flag on the command line, or None."""
+    try:
+        return int(sys.argv[sys.argv.index(flag) + 1], 0)
+    except (ValueError, IndexError):
+        return None
 
 
-def _app_dir() -> Path:
-    if getattr(sys, 'frozen', False):
-        return Path(sys.executable).resolve().parent
-    base = Path(__file__).resolve().parent if '__file__' in globals() else Path(sys.argv[0]).resolve().parent
-    return base
+def _ms(t0, t1):
+    return None if t0 is None else round((t1 - t0) * 1000, 1)
 
 
-def _prefs_path() -> Path:
-    return _app_dir() / "preferences.json"
+class HistoryModel(QAbstractTableModel):
+    """Read-only view over the attempt history; the view only asks for visible rows."""
+    HEADERS = ("Problem", "Your answer", "Correct answer")
+    KEYS = ("problem", "user", "correct")
 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._green = QBrush(QColor(215, 245, 223))
+        self._red = QBrush(QColor(255, 221, 221))
 
-def _prefs_exist_and_valid() -> bool:
-    p = _prefs_path()
-    if not p.exists():
-        return False
-    try:
-        with p.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        return isinstance(data, dict)
-    except Exception:
-        return False
+    def set_history(self, history: list):
+        self.beginResetModel()
+        self._rows = history
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return item[self.KEYS[index.column()]]
+        if role == Qt.BackgroundRole:
+            return self._green if item["ok"] else self._red
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class ResultsModel(QAbstractTableModel):
+    """All stored results, newest first; rows are fetched a page at a time as the view scrolls."""
+    HEADERS = ("When", "Problem", "Your answer", "Correct answer", "Time (s)")
+
+    def __init__(self, store: "ResultsStore", parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._rows = []   # (id, ts, mode, op, n1, n2, correct, user, ok, ns), see results.ATTEMPT_COLUMNS
+        self._more = True
+        self._green = QBrush(QColor(215, 245, 223))
+        self._red = QBrush(QColor(255, 221, 221))
+
+    def reload(self):
+        self.beginResetModel()
+        self._rows = []
+        self._more = True
+        self.endResetModel()
+        self.fetchMore()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._more
+
+    def fetchMore(self, parent=QModelIndex()):
+        import sqlite3  # both already loaded by the store
+        from results import PAGE_SIZE
+        if parent.isValid() or not self._more:
+            return
+        try:
+            page = self._store.page(self._rows[-1][0] if self._rows else None, PAGE_SIZE)
+        except sqlite3.Error:
+            page = []
+        self._more = len(page) == PAGE_SIZE
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(page) - 1)
+            self._rows.extend(page)
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        _, ts, _, op, n1, n2, correct, user, ok, ns = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            col = index.column()
+            if col == 0:
+                return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
+            if col == 1:
+                return f"{n1} {op} {n2}"
+            if col == 4:
+                return "" if ns is None else f"{ns / 1e9:.2f}"
+            return user if col == 2 else correct
+        if role == Qt.BackgroundRole:
+            return self._green if ok else self._red
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class FlashOverlay(QWidget):
+    """Translucent colour wash over the window; showing or hiding it is one repaint, no re-polish."""
+    COLORS = {'green': QColor(61, 220, 132, 150), 'red': QColor(255, 107, 107, 150)}
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setFocusPolicy(Qt.NoFocus)
+        self._color = self.COLORS['green']
+        self.hide()
+
+    def flash(self, color: str):
+        self._color = self.COLORS[color]
+        self.setGeometry(self.parentWidget().rect())
+        self.raise_()
+        self.show()
+        self.update()
+
+    def paintEvent(self, event):
+        QPainter(self).fillRect(event.rect(), self._color)
 
 
 class ArithmeticTrainer(QWidget):
-    def __init__(self):
+    prefs_saved = pyqtSignal(str)  # "" or the error, emitted from the writer thread
+    results_saved = pyqtSignal(str)  # likewise for the game written to results.sqlite3
+
+    def __init__(self, data_dir=None):
+        t_init = time.perf_counter()
         super().__init__()
+        self.data_dir = data_dir  # None: next to the app, see paths.app_dir
 
         # Game state
         self.score = 0
         self.time_left = 120
         self.operator = '+'
-        self.num1 = Decimal(0)
-        self.num2 = Decimal(0)
+        self.num1 = Num(0)
+        self.num2 = Num(0)
+        self.problem = None
         self.mode = "range"  # "range" or "sigfigs"
-        self.history = []         # list of {"problem","user","correct","ok"}
+        self.prefs = default_prefs()  # live preferences; widgets only mirror them
+        self.prefs_store = PreferencesStore(_prefs_path(self.data_dir))
+        self.prefs_saved.connect(self._on_prefs_saved)
+        self.results_saved.connect(self._on_results_saved)
+        self.history = []         # list of {"problem","user","correct","ok","op","ns"}
+        self.session_stats = SessionStats()  # running per-operator aggregates of this game
         self.history_table = None
-
-        # Flash baseline
-        self._base_stylesheet = ""
-        self._base_stylesheet_saved = False
+        self.history_model = None
+        self._shown_ns = time.monotonic_ns()  # when the current problem appeared
+        self.settings = Settings()
+        self.generator = ProblemGenerator(self.settings)
+        self.settings_digest = self.settings.digest()
+        self.last_session = None  # timing of the most recent game, see end_game
+        self.seed = None          # seed of the current game's problem stream
+        self.feasibility = ()     # feasibility.analyze report for the current game's settings
+        self._shown = []          # [op, n1, n2] of every problem shown this game, for replay
+        self.prefetcher = ProblemPrefetcher()
+        self.attempt_log = AttemptLog(_attempts_path(self.data_dir))
+        self.session_log = AttemptLog(_sessions_path(self.data_dir))  # one timing record per game
+        self.results = None       # ResultsStore, opened by _results_store at the first game end or History
+        self._result_rows = []    # this game's graded attempts, written to results in one go by end_game
+        self.clock = GameClock()
+        self.weakness = None  # WeaknessModel, loaded with the first game
+        self._weakness_writer = BatchWriter(self._write_weakness, "weakness-writer")
+        from profiling import GameProfiler, profile_requested
+        self.profiler = GameProfiler(_profile_path(self.data_dir)) if profile_requested(sys.argv) else None
+
+        # Flash
         self._flash_restore_timer = QTimer(self)
         self._flash_restore_timer.setSingleShot(True)
 
         # UI
         self.initUI()
 
-        if not self._base_stylesheet_saved:
-            self._base_stylesheet = self.styleSheet()
-            self._base_stylesheet_saved = True
-
         # Load prefs if present
         self._load_preferences_if_any()
 
         # Initial screen
-        if _prefs_exist_and_valid():
+        if self.prefs_store.loaded:
             self.show_home_screen()
         else:
             self.show_preferences_screen()
 
+        # Startup timing, completed by the first paint
+        t_done = time.perf_counter()
+        self._first_frame_pending = True
+        self.startup_report = {
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "process_to_import_ms": _ms(process_start(), _T_IMPORT),
+            "import_to_init_ms": _ms(_T_IMPORT, t_init),
+            "init_ms": _ms(t_init, t_done),
+            "settings_panel_built": self.settings_panel is not None,
+        }
+        self._t_init_done = t_done
+
     # ---------------- UI BUILD ----------------
     def initUI(self):
         self.setWindowTitle("Arithmetic Trainer")
         self.setGeometry(100, 100, 600, 840)
 
         self.root = QVBoxLayout(self)
+        self.settings_panel = None  # see _ensure_settings_panel
+        self.results_panel = None   # see _ensure_results_panel
 
         # Home (Start + Preferences)
         self.home_panel = QFrame(self)
         home_layout = QHBoxLayout(self.home_panel)
         self.home_start_button = QPushButton("Start", self)
         self.home_start_button.setStyleSheet("font-size: 18px;")
-        self.home_start_button.clicked.connect(self.start_game)
+        self.home_start_button.clicked.connect(lambda: self.start_game())
         self.home_prefs_button = QPushButton("Preferences…", self)
         self.home_prefs_button.setStyleSheet("font-size: 18px;")
         self.home_prefs_button.clicked.connect(self.show_preferences_screen)
+        self.preset_combo = QComboBox(self)
+        self.preset_combo.setStyleSheet("font-size: 16px;")
+        self.preset_combo.setToolTip("Preset")
+        self.preset_combo.currentTextChanged.connect(self._on_preset_selected)
+        self.home_seed_button = QPushButton("Seed…", self)
+        self.home_seed_button.setToolTip("Play a given seed: the same seed and settings give the same problems")
+        self.home_seed_button.clicked.connect(self._on_seed_clicked)
+        self.home_replay_button = QPushButton("Replay last", self)
+        self.home_replay_button.setToolTip("Re-run the problems of the last recorded game")
+        self.home_replay_button.clicked.connect(self._on_replay_clicked)
+        self.home_history_button = QPushButton("History…", self)
+        self.home_history_button.setToolTip("Every recorded answer, newest first")
+        self.home_history_button.clicked.connect(self.show_results_screen)
         home_layout.addWidget(self.home_start_button)
         home_layout.addWidget(self.home_prefs_button)
+        home_layout.addWidget(self.preset_combo)
+        home_layout.addWidget(self.home_seed_button)
+        home_layout.addWidget(self.home_replay_button)
+        home_layout.addWidget(self.home_history_button)
+
+        # Gameplay widgets
+        self.problem_label = QLabel("", self); self.problem_label.setStyleSheet("font-size: 28px; font-weight: 600;")
+        self.answer_entry = QLineEdit(self); self.answer_entry.setStyleSheet("font-size: 24px;"); self.answer_entry.setAlignment(Qt.AlignCenter)
+        self.answer_entry.returnPressed.connect(self.check_answer)
+        self.answer_entry.textChanged.connect(self._on_answer_edited)
+        self.result_label = QLabel("", self); self.result_label.setStyleSheet("font-size: 18px; min-height: 36px;")
+        self.score_label = QLabel(f"Score: {self.score}", self); self.score_label.setStyleSheet("font-size: 18px;")
+        self.timer_label = QLabel(format_remaining(self.time_left * 1_000_000_000), self); self.timer_label.setStyleSheet("font-size: 18px;")
+        self.back_button = QPushButton("Back"); self.back_button.setStyleSheet("font-size: 18px;")
+        self.back_button.clicked.connect(self.show_home_screen); self.back_button.hide()
 
-        # Preferences panel
+        # Assemble root
+        self.root.addWidget(self.home_panel)
+        self.root.addSpacing(8)
+        self.root.addWidget(self.problem_label)
+        self.root.addWidget(self.answer_entry)
+        self.root.addWidget(self.result_label)
+        self.root.addWidget(self.score_label)
+        self.root.addWidget(self.timer_label)
+        self.root.addWidget(self.back_button)
+        self.setLayout(self.root)
+
+        self.flash_overlay = FlashOverlay(self)
+        self._flash_restore_timer.timeout.connect(self.flash_overlay.hide)
+
+        # Timer
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.update_timer)
+
+        self._hide_game_widgets()
+
+    # ---------------- Preferences panel ----------------
+    def _ensure_settings_panel(self):
+        # Built on first use; a saved-prefs start goes straight to home without it
+        if self.settings_panel is not None:
+            return
         self.settings_panel = QFrame(self)
         self.settings_panel.setFrameShape(QFrame.StyledPanel)
         self.form_layout = QFormLayout(self.settings_panel)
@@ -213,6 +446,14 @@ class ArithmeticTrainer(QWidget):
         self.toggle_show_problem_text = QCheckBox("Show problem text in feedback"); self.toggle_show_problem_text.setChecked(False)
         fb3.addWidget(self.toggle_show_problem_text); self.form_layout.addRow(fb3)
 
+        fb4 = QHBoxLayout()
+        self.toggle_auto_advance = QCheckBox("Auto-advance as soon as the answer is right (no Enter)"); self.toggle_auto_advance.setChecked(False)
+        fb4.addWidget(self.toggle_auto_advance); self.form_layout.addRow(fb4)
+
+        fb5 = QHBoxLayout()
+        self.toggle_adaptive = QCheckBox("Adaptive: drill the range-mode problems I miss or answer slowly"); self.toggle_adaptive.setChecked(False)
+        fb5.addWidget(self.toggle_adaptive); self.form_layout.addRow(fb5)
+
         # Game time
         self.form_layout.addRow(QLabel("<b>Game time</b>"))
         time_row = QHBoxLayout()
@@ -224,39 +465,20 @@ class ArithmeticTrainer(QWidget):
         prefs_btn_row = QHBoxLayout()
         self.save_prefs_button = QPushButton("Save my choices")
         self.save_prefs_button.clicked.connect(self._on_save_clicked)
+        self.save_as_preset_button = QPushButton("Save as preset…")
+        self.save_as_preset_button.clicked.connect(self._on_save_as_preset_clicked)
         self.back_to_home_button = QPushButton("Back")
         self.back_to_home_button.clicked.connect(self.show_home_screen)
         prefs_btn_row.addWidget(self.save_prefs_button)
+        prefs_btn_row.addWidget(self.save_as_preset_button)
         prefs_btn_row.addWidget(self.back_to_home_button)
         self.form_layout.addRow(prefs_btn_row)
+        self.feasibility_label = QLabel("")
+        self.feasibility_label.setWordWrap(True)
+        self.form_layout.addRow(self.feasibility_label)
 
-        # Gameplay widgets
-        self.problem_label = QLabel("", self); self.problem_label.setStyleSheet("font-size: 28px; font-weight: 600;")
-        self.answer_entry = QLineEdit(self); self.answer_entry.setStyleSheet("font-size: 24px;"); self.answer_entry.setAlignment(Qt.AlignCenter)
-        self.answer_entry.returnPressed.connect(self.check_answer)
-        self.result_label = QLabel("", self); self.result_label.setStyleSheet("font-size: 18px; min-height: 36px;")
-        self.score_label = QLabel(f"Score: {self.score}", self); self.score_label.setStyleSheet("font-size: 18px;")
-        self.timer_label = QLabel(f"Time left: {self.time_left} s", self); self.timer_label.setStyleSheet("font-size: 18px;")
-        self.back_button = QPushButton("Back"); self.back_button.setStyleSheet("font-size: 18px;")
-        self.back_button.clicked.connect(self.show_home_screen); self.back_button.hide()
-
-        # Assemble root
-        self.root.addWidget(self.home_panel)
-        self.root.addWidget(self.settings_panel)
-        self.root.addSpacing(8)
-        self.root.addWidget(self.problem_label)
-        self.root.addWidget(self.answer_entry)
-        self.root.addWidget(self.result_label)
-        self.root.addWidget(self.score_label)
-        self.root.addWidget(self.timer_label)
-        self.root.addWidget(self.back_button)
-        self.setLayout(self.root)
-
-        # Timer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_timer)
-
-        self._hide_game_widgets()
+        self.root.insertWidget(1, self.settings_panel)
+        self._push_prefs_to_panel()
 
     # ---------------- UI helpers ----------------
     def _make_weight_slider(self, default: int = 3):
@@ -300,13 +522,16 @@ class ArithmeticTrainer(QWidget):
 
     def _remove_history_table(self):
         if self.history_table is not None:
-            self.root.removeWidget(self.history_table)
-            self.history_table.deleteLater()
-            self.history_table = None
+            self.history_table.hide()
+            self.history_model.set_history([])
 
     def show_home_screen(self):
         self.home_panel.show()
-        self.settings_panel.hide()
+        if self.settings_panel is not None:
+            self._sync_prefs_from_panel()
+            self.settings_panel.hide()
+        if self.results_panel is not None:
+            self.results_panel.hide()
         self._hide_game_widgets()
         self.back_button.hide()
         if not self.history:
@@ -314,13 +539,28 @@ class ArithmeticTrainer(QWidget):
 
     def show_preferences_screen(self):
         self.home_panel.hide()
+        self._ensure_settings_panel()
         self.settings_panel.show()
         self._hide_game_widgets()
         self._remove_history_table()
 
+    def show_results_screen(self):
+        self.home_panel.hide()
+        if self.settings_panel is not None:
+            self.settings_panel.hide()
+        self._ensure_results_panel()
+        self.results_model.reload()
+        self.results_table.scrollToTop()
+        self.results_panel.show()
+        self._hide_game_widgets()
+        self._remove_history_table()
+
     def show_game_screen(self):
         self.home_panel.hide()
-        self.settings_panel.hide()
+        if self.settings_panel is not None:
+            self.settings_panel.hide()
+        if self.results_panel is not None:
+            self.results_panel.hide()
         self.problem_label.show()
         self.answer_entry.show()
         self.result_label.show()
@@ -330,27 +570,53 @@ class ArithmeticTrainer(QWidget):
         self._remove_history_table()
 
     def show_end_screen(self):
-        # Compute summary
-        correct = sum(1 for h in self.history if h.get("ok"))
-        incorrect = len(self.history) - correct
+        # Counts come from the running aggregates, not a pass over the history
+        totals = self.session_stats.total
 
         # Return to home layout, then show summary counts
         self.show_home_screen()
-        self.result_label.setText(f"Correct Answers: {correct}\nIncorrect Answers: {incorrect}")
+        summary = f"Correct Answers: {totals.correct}\nIncorrect Answers: {totals.incorrect}"
+        latency = format_latency_summary(latency_summary(self.history))
+        if self.last_session is not None:
+            summary += f"\nGame length: {self.last_session['actual_s']:.2f} s (drift {self.last_session['drift_ms']:+.0f} ms)"
+            summary += f"\nSeed: {self.seed} (settings {self.settings_digest})"
+        if self.settings.adaptive and self.weakness is not None:
+            weakest = self.weakness.weakest(3)
+            if weakest:
+                summary += "\nFocus: " + ", ".join(f"{n1} {OP_SYMBOLS[op]} {n2}" for op, n1, n2, _ in weakest)
+        breakdown = format_session_stats(self.session_stats)
+        if breakdown:
+            summary += "\n\n" + breakdown
+        self.result_label.setText(summary + ("\n\n" + latency if latency else ""))
         self.result_label.show()
 
         # Build the scrollable history table below the summary
         self._build_history_table()
 
+    def _on_results_saved(self, error: str):
+        if not error:
+            return
+        print(f"results: game not saved: {error}", file=sys.stderr)
+        if not self.clock.running:  # still on the summary of that game
+            self.result_label.setText(self.result_label.text() + f"\n\nHistory not saved: {error}")
+
     # ---------------- Results table ----------------
     def _build_history_table(self):
-        self._remove_history_table()
-        table = QTableWidget(self)
-        table.setColumnCount(3)
-        table.setHorizontalHeaderLabels(["Problem", "Your answer", "Correct answer"])
-        table.setRowCount(len(self.history))
+        if self.history_table is None:
+            self._create_history_table()
+        self.history_model.set_history(self.history)
+        self._size_history_columns()
+        self.history_table.scrollToTop()
+        self.history_table.show()
+
+    def _create_history_table(self):
+        # Built once and reused; the model hands rows to the view on demand
+        self.history_model = HistoryModel(self)
+        table = QTableView(self)
+        table.setModel(self.history_model)
         table.verticalHeader().setVisible(False)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         table.setSelectionBehavior(QAbstractItemView.SelectRows)
         table.setSelectionMode(QAbstractItemView.NoSelection)
         table.setStyleSheet("font-size: 14px;")
@@ -359,308 +625,206 @@ class ArithmeticTrainer(QWidget):
         table.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
         table.setMinimumHeight(240)
         table.setMaximumHeight(520)
-
-        green = QBrush(QColor(215, 245, 223))
-        red = QBrush(QColor(255, 221, 221))
-
-        for r, item in enumerate(self.history):
-            prob = QTableWidgetItem(item["problem"])
-            yours = QTableWidgetItem(item["user"])
-            corr = QTableWidgetItem(item["correct"])
-            table.setItem(r, 0, prob)
-            table.setItem(r, 1, yours)
-            table.setItem(r, 2, corr)
-            brush = green if item["ok"] else red
-            for c in range(3):
-                table.item(r, c).setBackground(brush)
-
-        table.resizeColumnsToContents()
         table.horizontalHeader().setStretchLastSection(True)
         self.root.addWidget(table)
         self.history_table = table
 
+    def _size_history_columns(self, sample: int = 200):
+        # Measure the header plus an evenly spaced sample of rows instead of every cell
+        table = self.history_table
+        fm = table.fontMetrics()
+        step = max(1, len(self.history) // sample)
+        rows = self.history[::step][:sample]
+        pad = 2 * table.style().pixelMetric(QStyle.PM_FocusFrameHMargin) + 16
+        for col, (header, key) in enumerate(zip(HistoryModel.HEADERS, HistoryModel.KEYS)):
+            width = max([fm.horizontalAdvance(header)] + [fm.horizontalAdvance(r[key]) for r in rows])
+            table.setColumnWidth(col, width + pad)
+
+    # ---------------- Stored results ----------------
+    def _results_store(self) -> "ResultsStore":
+        if self.results is None:
+            from results import ResultsStore
+            self.results = ResultsStore(_results_path(self.data_dir))
+        return self.results
+
+    def _ensure_results_panel(self):
+        # Built on first use; the model pulls pages from results.sqlite3 as the table scrolls
+        if self.results_panel is not None:
+            return
+        self.results_panel = QFrame(self)
+        layout = QVBoxLayout(self.results_panel)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.results_model = ResultsModel(self._results_store(), self)
+        table = QTableView(self.results_panel)
+        table.setModel(self.results_model)
+        table.verticalHeader().setVisible(False)
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionMode(QAbstractItemView.NoSelection)
+        table.setStyleSheet("font-size: 14px;")
+        table.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        table.horizontalHeader().setStretchLastSection(True)
+        # Fixed widths from the headers and a typical row; sizing to contents would read every page
+        fm = table.fontMetrics()
+        sample = ("2000-01-01 00:00", "0.0000 / 0.0000", "-0.000000", "-0.000000", "000.00")
+        for col, (header, text) in enumerate(zip(ResultsModel.HEADERS, sample)):
+            table.setColumnWidth(col, max(fm.horizontalAdvance(header), fm.horizontalAdvance(text)) + 24)
+        back = QPushButton("Back")
+        back.setStyleSheet("font-size: 18px;")
+        back.clicked.connect(self.show_home_screen)
+        layout.addWidget(table)
+        layout.addWidget(back)
+        self.root.addWidget(self.results_panel)
+        self.results_table = table
+
     # ---------------- Decimal helpers ----------------
-    @staticmethod
-    def _format_num(v) -> str:
-        d = Decimal(v) if not isinstance(v, Decimal) else v
-        if d == d.to_integral_value():
-            return str(d.quantize(Decimal('1')))
-        s = format(d.normalize(), 'f')
-        if '.' in s:
-            s = s.rstrip('0').rstrip('.')
-        return s
-
-    @staticmethod
-    def _sigfigs(d: Decimal) -> int:
-        if not isinstance(d, Decimal):
-            d = Decimal(d)
-        if d.is_zero():
-            return 1
-        dn = d.normalize()
-        return len(dn.as_tuple().digits)
-
-    @staticmethod
-    def _decimal_places_leq_one(x: Decimal) -> bool:
-        if x == x.to_integral_value():
-            return True
-        try:
-            return x == x.quantize(Decimal('0.1'))
-        except Exception:
-            return False
+    _format_num = staticmethod(format_num)
+    _sigfigs = staticmethod(sigfigs)
+    _decimal_places_leq_one = staticmethod(decimal_places_leq_one)
+    _norm = staticmethod(norm)
 
-    @staticmethod
-    def _norm(a: int, b: int):
-        return (a, b) if a <= b else (b, a)
-
-    def _get_add_ranges(self):
-        a1 = self.addition_range1_spinbox1.value()
-        a2 = self.addition_range1_spinbox2.value()
-        b1 = self.addition_range2_spinbox1.value()
-        b2 = self.addition_range2_spinbox2.value()
-        return self._norm(a1, a2), self._norm(b1, b2)
-
-    def _get_mul_ranges(self):
-        x1 = self.multiplication_range1_spinbox1.value()
-        x2 = self.multiplication_range1_spinbox2.value()
-        y1 = self.multiplication_range2_spinbox1.value()
-        y2 = self.multiplication_range2_spinbox2.value()
-        return self._norm(x1, x2), self._norm(y1, y2)
-
-    def _compute_answer_decimal(self, n1, n2, op) -> Decimal:
-        d1, d2 = (n1 if isinstance(n1, Decimal) else Decimal(n1)), (n2 if isinstance(n2, Decimal) else Decimal(n2))
-        if op == '+': return d1 + d2
-        if op == '-': return d1 - d2
-        if op == '*': return d1 * d2
-        if op == '/': return d1 / d2
-        raise ValueError("Unknown operator")
+    def _compute_answer_decimal(self, n1, n2, op):
+        return compute_answer(n1, n2, op)
 
     def _round_to_sigfigs(self, x: Decimal, sig: int) -> Decimal:
-        if x.is_zero():
-            return Decimal('0')
-        shift = - (x.adjusted())
-        quant = Decimal(1).scaleb(shift + (sig - 1))
-        y = (x * quant).to_integral_value(rounding=ROUND_HALF_UP)
-        return y / quant
-
-    # Random exact sig-fig value (avoid mantissas ending in 0 so count is stable after normalize)
-    def _rand_sigfig_value(self, sf_min, sf_max, exp_min, exp_max) -> Decimal:
-        sf_lo, sf_hi = self._norm(sf_min, sf_max)
-        k_lo, k_hi = self._norm(exp_min, exp_max)
-        sf = random.randint(sf_lo, sf_hi)
-        k = random.randint(k_lo, k_hi)
-
-        m_lo = 10 ** (sf - 1)
-        m_hi = 10 ** sf - 1
-        while True:
-            m = random.randint(m_lo, m_hi)
-            if m % 10 != 0 or sf == 1:
-                break
-
-        val = Decimal(m) * (Decimal(10) ** Decimal(k - (sf - 1)))
-        return val.normalize()
-
-    def _rand_quotient_max_one_decimal(self) -> Decimal:
-        # Ensures finite decimal with ≤1 decimal place
-        if random.random() < 0.5:
-            q = Decimal(random.randint(-99, 99))
-            if q == 0:
-                q = Decimal(1)
-            return q
-        else:
-            k = random.randint(-990, 990)
-            if k % 10 == 0:
-                k += 1
-            q = Decimal(k) / Decimal(10)
-            if abs(q) < Decimal('0.1'):
-                q = Decimal('0.1') if q >= 0 else Decimal('-0.1')
-            return q
-
-    # ---------------- Operator weighting ----------------
-    def _weighted_choice_operator(self):
-        ops = []
-        weights = []
-        if self.addition_checkbox.isChecked():      ops.append('+'); weights.append(self.add_weight_slider.value())
-        if self.subtraction_checkbox.isChecked():   ops.append('-'); weights.append(self.sub_weight_slider.value())
-        if self.multiplication_checkbox.isChecked():ops.append('*'); weights.append(self.mul_weight_slider.value())
-        if self.division_checkbox.isChecked():      ops.append('/'); weights.append(self.div_weight_slider.value())
-        if not ops:
-            return None
-        if any(w > 0 for w in weights):
-            ops_f = [op for op, w in zip(ops, weights) if w > 0]
-            weights_f = [w for w in weights if w > 0]
-            return random.choices(ops_f, weights=weights_f, k=1)[0]
-        return random.choice(ops)
-
-    # ---------------- Result caps (filter only) ----------------
-    def _cap_ok_for_result(self, op: str, result: Decimal) -> bool:
-        s = self._sigfigs(result)
-        if op == '+':  return s <= self.max_sig_add_spin.value()
-        if op == '-':  return s <= self.max_sig_sub_spin.value()
-        if op == '*':  return s <= self.max_sig_mul_spin.value()
-        if op == '/':  return s <= self.max_sig_div_spin.value() and self._decimal_places_leq_one(result)
-        return True
+        return round_to_sigfigs(x, sig)
 
     # ---------------- Problem generation ----------------
+    def _refresh_generator(self, settings: Settings = None, seed: int = None, problems=None):
+        # Snapshot the preferences once; generation never reads them again
+        if settings is None:
+            settings = Settings.from_prefs(self._collect_preferences())
+            # Operators whose caps can't be met are left out, so no problem runs the whole rejection loop
+            from feasibility import analyze, playable
+            self.feasibility = analyze(settings)
+            settings = playable(settings, self.feasibility)
+        else:
+            self.feasibility = ()  # a replayed spec was playable when it was recorded
+        self.settings = settings
+        if self.weakness is None:
+            from adaptive import WeaknessModel
+            self.weakness = WeaknessModel.load(_weakness_path(self.data_dir))
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(32)
+        gen = ProblemGenerator(self.settings, self.weakness, random.Random(self.seed))
+        if self.profiler is not None:
+            gen.counters = self.profiler.counters
+        if problems and self.settings.adaptive:
+            # Adaptive draws depend on the answers given, so the seed alone can't rebuild them
+            gen = ReplayGenerator(ReplayGenerator.parse(problems), gen)
+        self.generator = gen
+        self.settings_digest = self.settings.digest()
+        self._shown = []
+        self.prefetcher.reset(self.generator)
+
     def generate_problem(self):
-        op = self._weighted_choice_operator()
-        if not op:
+        problem = self.prefetcher.next()
+        self.problem = problem
+        if problem is None:
             self.problem_label.setText("Select at least one operation.")
             return
-        self.operator = op
-
-        last_pair = None
-        for _ in range(800):  # try hard to honor every preference
-            if self.mode == "range":
-                if op in ('+', '-'):
-                    (a_lo, a_hi), (b_lo, b_hi) = self._get_add_ranges()
-                    n1 = Decimal(random.randint(a_lo, a_hi))
-                    n2 = Decimal(random.randint(b_lo, b_hi))
-                    if op == '-' and n1 < n2:
-                        n1, n2 = n2, n1
-                else:  # * or /
-                    (x_lo, x_hi), (y_lo, y_hi) = self._get_mul_ranges()
-                    n1i = random.randint(x_lo, x_hi)
-                    n2i = random.randint(y_lo, y_hi)
-                    if op == '/':
-                        n1 = Decimal(n1i * n2i)  # integer quotient
-                        n2 = Decimal(n2i)
-                    else:
-                        n1 = Decimal(n1i)
-                        n2 = Decimal(n2i)
-                last_pair = (n1, n2)
-                res = self._compute_answer_decimal(n1, n2, op)
-                if self._cap_ok_for_result(op, res):
-                    break
-
-            else:  # sigfigs mode
-                if op == '/':
-                    # Build division so that result is EXACT with ≤1 decimal and operands match requested sig-fig ranges.
-                    A_min, A_max = self.a_sig_min.value(), self.a_sig_max.value()
-                    B_min, B_max = self.b_sig_min.value(), self.b_sig_max.value()
-
-                    built = False
-                    for _attempt in range(400):
-                        use_A_for_left = random.choice([True, False])
-                        # pick desired sig counts for the two roles
-                        sfa = random.randint(*self._norm(A_min, A_max))
-                        sfb = random.randint(*self._norm(B_min, B_max))
-
-                        # build divisor first (respect its intended range depending on which side it maps to)
-                        if use_A_for_left:
-                            # left uses A-spec, right (divisor) uses B-spec
-                            b = self._rand_sigfig_value(self.b_sig_min.value(), self.b_sig_max.value(),
-                                                        self.b_exp_min.value(), self.b_exp_max.value())
-                            if not (B_min <= self._sigfigs(b) <= B_max) or b == 0:
-                                continue
-                            q = self._rand_quotient_max_one_decimal()  # exact finite decimal with ≤1 dp
-                            a = q * b  # DO NOT ROUND; shape by rejection
-                            if self._sigfigs(a) != sfa:
-                                continue
-                            res = a / b  # == q exactly
-                            if not self._cap_ok_for_result('/', res):
-                                continue
-                            last_pair = (a, b)
-                            built = True
-                            break
-                        else:
-                            # left uses B-spec, right (divisor) uses A-spec
-                            b = self._rand_sigfig_value(self.a_sig_min.value(), self.a_sig_max.value(),
-                                                        self.a_exp_min.value(), self.a_exp_max.value())
-                            if not (A_min <= self._sigfigs(b) <= A_max) or b == 0:
-                                continue
-                            q = self._rand_quotient_max_one_decimal()
-                            a = q * b
-                            if self._sigfigs(a) != sfb:
-                                continue
-                            res = a / b
-                            if not self._cap_ok_for_result('/', res):
-                                continue
-                            # Put operands so that left operand corresponds to B-spec, right to A-spec
-                            last_pair = (a, b)  # still a / b
-                            built = True
-                            break
-                    if built:
-                        break
-
-                    # last resort: simple integer quotient respecting caps
-                    n2 = Decimal(random.randint(2, 99))
-                    q = Decimal(random.randint(1, 99))
-                    n1 = n2 * q
-                    res = n1 / n2
-                    if self._cap_ok_for_result('/', res):
-                        last_pair = (n1, n2)
-                        break
+        self.operator, self.num1, self.num2 = problem.op, problem.n1, problem.n2
+        self._shown.append([problem.op, str(problem.n1), str(problem.n2)])
+        self.problem_label.setText(problem.text)
+        self._shown_ns = time.monotonic_ns()
+
+    # ---------------- Seeds and replay ----------------
+    def _on_seed_clicked(self):
+        text, ok = QInputDialog.getText(self, "Play seed", "Seed:", text=str(self.seed or ""))
+        if not ok:
+            return
+        try:
+            seed = int(text.strip(), 0)
+        except ValueError:
+            self.result_label.setText("A seed is a whole number.")
+            self.result_label.show()
+            return
+        self.start_game(seed=seed)
 
-                else:
-                    # +, -, *
-                    use_A_for_left = random.choice([True, False])
-                    a_val = self._rand_sigfig_value(self.a_sig_min.value(), self.a_sig_max.value(),
-                                                    self.a_exp_min.value(), self.a_exp_max.value())
-                    b_val = self._rand_sigfig_value(self.b_sig_min.value(), self.b_sig_max.value(),
-                                                    self.b_exp_min.value(), self.b_exp_max.value())
-                    n1, n2 = (a_val, b_val) if use_A_for_left else (b_val, a_val)
-                    if op == '-' and n1 < n2:
-                        n1, n2 = n2, n1
-                    res = self._compute_answer_decimal(n1, n2, op)
-                    if self._cap_ok_for_result(op, res):
-                        last_pair = (n1, n2)
-                        break
-
-        # Use the last acceptable pair
-        if last_pair is None:
-            self.operator = '+'
-            self.num1, self.num2 = Decimal(1), Decimal(1)
-        else:
-            self.num1, self.num2 = last_pair
+    def _on_replay_clicked(self):
+        record = self._last_session_record()
+        if record is None:
+            self.result_label.setText("No recorded game to replay yet.")
+            self.result_label.show()
+            return
+        self.start_game(replay=record)
 
-        self.problem_label.setText(f"{self._format_num(self.num1)} {self.operator} {self._format_num(self.num2)}")
+    def _last_session_record(self):
+        last = None
+        for rec in read_attempts(_sessions_path(self.data_dir)):
+            if "seed" in rec and "settings_spec" in rec:
+                last = rec
+        return last
 
     # ---------------- Game flow ----------------
-    def start_game(self):
+    def start_game(self, seed: int = None, replay: dict = None):
+        """Start a game; seed fixes the problem stream, replay re-runs a session_log record."""
         self.history = []
+        self.session_stats = SessionStats()
+        self._result_rows = []
         self.score = 0
-        self.time_left = self.game_time_spinbox.value()
+        if self.profiler is not None:
+            self.profiler.start()
+        if replay is not None:
+            self._refresh_generator(Settings.from_dict(replay["settings_spec"]), replay["seed"], replay["problems"])
+            self.time_left = int(replay["nominal_s"])
+        else:
+            self._refresh_generator(seed=seed)
+            self.time_left = self.prefs["game_time"]
         self.score_label.setText(f"Score: {self.score}")
-        self.timer_label.setText(f"Time left: {self.time_left} s")
-        self.result_label.setText("")
+        self.timer_label.setText(format_remaining(self.time_left * 1_000_000_000))
+        from feasibility import describe
+        self.result_label.setText(describe(self.feasibility))
         self.generate_problem()
         self.show_game_screen()
-        self.timer.start(1000)
+        # The deadline, not the tick count, decides when the game ends
+        self.clock.start(self.time_left)
+        self.timer.start(TICK_MS)
         self.answer_entry.setFocus()
         self.answer_entry.selectAll()
 
     def update_timer(self):
-        if self.time_left > 0:
-            self.time_left -= 1
-            self.timer_label.setText(f"Time left: {self.time_left} s")
+        left_ns = self.clock.tick()
+        self.time_left = left_ns / 1e9
+        if left_ns > 0:
+            self.timer_label.setText(format_remaining(left_ns))
         else:
             self.end_game()
 
     def check_answer(self):
-        if not self.answer_entry.isVisible():
+        if self.profiler is None:
+            self._check_answer()
             return
-        user_text = self.answer_entry.text().strip()
-        try:
-            user_dec = Decimal(user_text)
-        except Exception:
-            if self.toggle_show_correct.isChecked():
+        t0 = time.perf_counter_ns()
+        self._check_answer()
+        if self.profiler.counters is not None:
+            self.profiler.counters.timed("check_answer", time.perf_counter_ns() - t0)
+
+    def _check_answer(self):
+        if not self.answer_entry.isVisible() or self.problem is None:
+            return
+        if self.clock.expired():
+            # Answers after the deadline don't count, however late the tick is
+            self.end_game()
+            return
+        elapsed_ns = time.monotonic_ns() - self._shown_ns
+        problem = self.problem
+        toggles = self.prefs["toggles"]
+        prob_str, corr_str = problem.text, problem.answer_text
+        graded = problem.grade(self.answer_entry.text())
+        if graded is None:
+            if toggles["show_correct"]:
                 self.result_label.setText("Please enter a valid number!")
             self._do_flash('red')
             return
+        ok, user_str = graded
 
-        true_dec = self._compute_answer_decimal(self.num1, self.num2, self.operator)  # EXACT, never rounded
-        ok = (user_dec == true_dec)
-
-        prob_str = f"{self._format_num(self.num1)} {self.operator} {self._format_num(self.num2)}"
-        corr_str = self._format_num(true_dec)
-        user_str = self._format_num(user_dec)
-
-        if self.toggle_show_correct.isChecked():
+        if toggles["show_correct"]:
             if ok:
                 msg = "Correct!"
                 self._do_flash('green')
             else:
-                if self.toggle_show_problem_text.isChecked():
+                if toggles["show_problem_text"]:
                     msg = f"The correct answer to {prob_str} is {corr_str}"
                 else:
                     msg = f"The correct answer to the last problem was: {corr_str}"
@@ -673,39 +837,119 @@ class ArithmeticTrainer(QWidget):
         if ok:
             self.score += 1
 
-        self.history.append({"problem": prob_str, "user": user_str, "correct": corr_str, "ok": ok})
+        self.session_stats.record(self.operator, self.num1, self.num2, ok)
+        if self.settings.mode == "range":
+            self.weakness.record(self.operator, self.num1, self.num2, ok, elapsed_ns)
+        self.history.append({"problem": prob_str, "user": user_str, "correct": corr_str, "ok": ok,
+                             "op": self.operator, "ns": elapsed_ns})
+        ts, n1, n2 = time.time(), str(self.num1), str(self.num2)
+        self.attempt_log.append({
+            "ts": ts, "problem": prob_str, "op": self.operator, "n1": n1, "n2": n2,
+            "user": user_str, "correct": corr_str, "ok": ok, "ns": elapsed_ns, "settings": self.settings_digest,
+        })
+        self._result_rows.append((ts, self.settings.mode, self.operator, n1, n2, corr_str, user_str, ok, elapsed_ns))
         self.score_label.setText(f"Score: {self.score}")
 
-        self.answer_entry.selectAll()
+        if toggles["auto_advance"]:
+            self.answer_entry.clear()
+        else:
+            self.answer_entry.selectAll()
         self.generate_problem()
 
+    def _on_answer_edited(self, text: str):
+        # Zetamac-style: grade the moment the typed text is an accepted form of the answer
+        if self.problem is not None and self.prefs["toggles"]["auto_advance"] and text.strip() in self.problem.forms:
+            self.check_answer()
 
-    # Flash helper honoring toggles + robust restore
+    # Flash helper honoring toggles
     def _do_flash(self, color: str):
-        if not self.toggle_show_correct.isChecked():
+        if self.profiler is not None and self.profiler.counters is not None:
+            self.profiler.counters.count("flash " + color)
+        toggles = self.prefs["toggles"]
+        if not toggles["show_correct"]:
             return
-        if color == 'red' and not self.toggle_flash_incorrect.isChecked():
+        if color == 'red' and not toggles["flash_incorrect"]:
             return
-        if self._flash_restore_timer.isActive():
-            self._flash_restore_timer.stop()
-        flash_css = "background-color: #3ddc84;" if color == 'green' else "background-color: #ff6b6b;"
-        self.setStyleSheet(flash_css)
-        try:
-            if self._flash_restore_timer.receivers(self._flash_restore_timer.timeout):
-                self._flash_restore_timer.timeout.disconnect()
-        except Exception:
-            pass
-        self._flash_restore_timer.timeout.connect(lambda: self.setStyleSheet(self._base_stylesheet))
-        self._flash_restore_timer.start(120)
+        self.flash_overlay.flash(color)
+        self._flash_restore_timer.start(120)  # restarts if a flash is already showing
 
     def end_game(self):
         self.timer.stop()
+        if self.clock.running:
+            timing = self.clock.finish()
+            self.time_left = 0
+            self.last_session = dict(timing, ts=time.time(), score=self.score, attempts=len(self.history),
+                                     settings=self.settings_digest, seed=self.seed,
+                                     settings_spec=self.settings.to_dict(), problems=self._shown)
+            self.session_log.append(self.last_session)
+            self._results_store().save_game(self.last_session, self._result_rows).add_done_callback(
+                lambda fut: self.results_saved.emit("" if fut.exception() is None else str(fut.exception())))
+            self._result_rows = []
+            self._save_weakness()
+            if self.profiler is not None:
+                self.profiler.finish(self.last_session, self.prefetcher.stats())
         self.show_end_screen()
 
+    def _save_weakness(self):
+        # Serialized here, written atomically off the GUI thread
+        if self.weakness is not None:
+            self._weakness_writer.put(self.weakness.to_json())
+
+    def _write_weakness(self, texts):
+        try:
+            atomic_write(_weakness_path(self.data_dir), texts[-1])  # only the newest snapshot matters
+        except OSError:
+            pass  # scores are a convenience; the previous file stays intact
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._first_frame_pending:
+            self._first_frame_pending = False
+            self._record_first_frame()
+
+    def _record_first_frame(self):
+        t = time.perf_counter()
+        report = self.startup_report
+        report["first_frame_ms"] = _ms(self._t_init_done, t)
+        report["total_ms"] = _ms(process_start(), t)
+        if report_requested(sys.argv):
+            report["ts"] = time.time()
+            print("startup: " + json.dumps(report), file=sys.stderr)
+            append_report(_startup_path(self.data_dir), report)
+
+    def closeEvent(self, event):
+        self.prefs_store.close()
+        self.attempt_log.close()
+        self.session_log.close()
+        if self.results is not None:
+            self.results.close()
+        self._weakness_writer.close()
+        self.prefetcher.stop()
+        super().closeEvent(event)
+
     # ---------------- Preferences (save/load) ----------------
     def _collect_preferences(self) -> dict:
+        if self.settings_panel is not None:
+            self._sync_prefs_from_panel()
+        return copy.deepcopy(self.prefs)
+
+    def _apply_preferences(self, prefs: dict) -> bool:
+        prefs = normalize_prefs(prefs)
+        if prefs is None:
+            return False
+        self.prefs = prefs
+        self.mode = prefs["mode"]
+        if self.settings_panel is not None:
+            self._push_prefs_to_panel()
+        return True
+
+    def _sync_prefs_from_panel(self):
+        self.prefs = normalize_prefs(self._read_panel())
+        self.mode = self.prefs["mode"]
+
+    def _read_panel(self) -> dict:
         return {
-            "mode": self.mode,
+            "mode": "range" if self.range_mode_radio.isChecked() else "sigfigs",
             "ops": {
                 "+": self.addition_checkbox.isChecked(),
                 "-": self.subtraction_checkbox.isChecked(),
@@ -744,117 +988,110 @@ class ArithmeticTrainer(QWidget):
             "toggles": {
                 "flash_incorrect": self.toggle_flash_incorrect.isChecked(),
                 "show_correct": self.toggle_show_correct.isChecked(),
-                "show_problem_text": self.toggle_show_problem_text.isChecked()
+                "show_problem_text": self.toggle_show_problem_text.isChecked(),
+                "auto_advance": self.toggle_auto_advance.isChecked(),
+                "adaptive": self.toggle_adaptive.isChecked(),
             }
         }
 
-    def _apply_preferences(self, prefs: dict) -> bool:
-        try:
-            mode = prefs.get("mode", "range")
-            if mode not in ("range", "sigfigs"): return False
-
-            ops = prefs.get("ops", {})
-            ranges = prefs.get("ranges", {})
-            weights = prefs.get("weights", {})
-            sfs = prefs.get("sigfigs", {})
-            maxsol = prefs.get("max_solution_sigfigs", {})
-            game_time = int(prefs.get("game_time", 120))
-            toggles = prefs.get("toggles", {})
-
-            # Ops
-            self.addition_checkbox.setChecked(bool(ops.get("+", True)))
-            self.subtraction_checkbox.setChecked(bool(ops.get("-", True)))
-            self.multiplication_checkbox.setChecked(bool(ops.get("*", True)))
-            self.division_checkbox.setChecked(bool(ops.get("/", True)))
-
-            # Ranges
-            def _set_pair(spin_lo, spin_hi, pair):
-                if not isinstance(pair, list) or len(pair) != 2: return
-                a, b = int(pair[0]), int(pair[1])
-                spin_lo.setValue(max(spin_lo.minimum(), min(spin_lo.maximum(), a)))
-                spin_hi.setValue(max(spin_hi.minimum(), min(spin_hi.maximum(), b)))
-            _set_pair(self.addition_range1_spinbox1, self.addition_range1_spinbox2, ranges.get("add_A", [2, 100]))
-            _set_pair(self.addition_range2_spinbox1, self.addition_range2_spinbox2, ranges.get("add_B", [2, 100]))
-            _set_pair(self.multiplication_range1_spinbox1, self.multiplication_range1_spinbox2, ranges.get("mul_X", [2, 12]))
-            _set_pair(self.multiplication_range2_spinbox1, self.multiplication_range2_spinbox2, ranges.get("mul_Y", [2, 100]))
-
-            # Weights
-            def _set_slider(slider, v):
-                slider.setValue(max(slider.minimum(), min(slider.maximum(), int(v))))
-            _set_slider(self.add_weight_slider, weights.get("+", 3))
-            _set_slider(self.sub_weight_slider, weights.get("-", 3))
-            _set_slider(self.mul_weight_slider, weights.get("*", 3))
-            _set_slider(self.div_weight_slider, weights.get("/", 3))
-
-            # Sig figs & exponents
-            def _set_pair_spin(spin_lo, spin_hi, pair):
-                if not isinstance(pair, list) or len(pair) != 2: return
-                lo, hi = int(pair[0]), int(pair[1])
-                spin_lo.setValue(max(spin_lo.minimum(), min(spin_lo.maximum(), lo)))
-                spin_hi.setValue(max(spin_hi.minimum(), min(spin_hi.maximum(), hi)))
-            _set_pair_spin(self.a_sig_min, self.a_sig_max, sfs.get("A_sig", [2, 3]))
-            _set_pair_spin(self.a_exp_min, self.a_exp_max, sfs.get("A_exp", [-2, 3]))
-            _set_pair_spin(self.b_sig_min, self.b_sig_max, sfs.get("B_sig", [2, 3]))
-            _set_pair_spin(self.b_exp_min, self.b_exp_max, sfs.get("B_exp", [-2, 3]))
-
-            # Max solution sig figs (caps for generator only)
-            self.max_sig_mul_spin.setValue(int(maxsol.get("*", 4)))
-            self.max_sig_div_spin.setValue(int(maxsol.get("/", 4)))
-            self.max_sig_add_spin.setValue(int(maxsol.get("+", 5)))
-            self.max_sig_sub_spin.setValue(int(maxsol.get("-", 5)))
-
-            # Time
-            self.game_time_spinbox.setValue(max(self.game_time_spinbox.minimum(),
-                                                min(self.game_time_spinbox.maximum(), game_time)))
-
-            # Mode radios
-            if mode == "range":
-                self.range_mode_radio.setChecked(True); self.sigfigs_mode_radio.setChecked(False)
-            else:
-                self.sigfigs_mode_radio.setChecked(True); self.range_mode_radio.setChecked(False)
-            self._on_mode_toggle(True)
-
-            # Toggles
-            self.toggle_flash_incorrect.setChecked(bool(toggles.get("flash_incorrect", True)))
-            self.toggle_show_correct.setChecked(bool(toggles.get("show_correct", True)))
-            self._on_show_correct_toggled(self.toggle_show_correct.isChecked())
-            self.toggle_show_problem_text.setChecked(bool(toggles.get("show_problem_text", False)) and self.toggle_show_correct.isChecked())
+    def _push_prefs_to_panel(self):
+        p = self.prefs
+        for box, op in ((self.addition_checkbox, "+"), (self.subtraction_checkbox, "-"),
+                        (self.multiplication_checkbox, "*"), (self.division_checkbox, "/")):
+            box.setChecked(p["ops"][op])
+
+        def _set_pair(spin_lo, spin_hi, pair):
+            spin_lo.setValue(pair[0])
+            spin_hi.setValue(pair[1])
+        ranges, sfs = p["ranges"], p["sigfigs"]
+        _set_pair(self.addition_range1_spinbox1, self.addition_range1_spinbox2, ranges["add_A"])
+        _set_pair(self.addition_range2_spinbox1, self.addition_range2_spinbox2, ranges["add_B"])
+        _set_pair(self.multiplication_range1_spinbox1, self.multiplication_range1_spinbox2, ranges["mul_X"])
+        _set_pair(self.multiplication_range2_spinbox1, self.multiplication_range2_spinbox2, ranges["mul_Y"])
+        _set_pair(self.a_sig_min, self.a_sig_max, sfs["A_sig"])
+        _set_pair(self.a_exp_min, self.a_exp_max, sfs["A_exp"])
+        _set_pair(self.b_sig_min, self.b_sig_max, sfs["B_sig"])
+        _set_pair(self.b_exp_min, self.b_exp_max, sfs["B_exp"])
+
+        for slider, op in ((self.add_weight_slider, "+"), (self.sub_weight_slider, "-"),
+                           (self.mul_weight_slider, "*"), (self.div_weight_slider, "/")):
+            slider.setValue(p["weights"][op])
+        for spin, op in ((self.max_sig_mul_spin, "*"), (self.max_sig_div_spin, "/"),
+                         (self.max_sig_add_spin, "+"), (self.max_sig_sub_spin, "-")):
+            spin.setValue(p["max_solution_sigfigs"][op])
+        self.game_time_spinbox.setValue(p["game_time"])
+
+        if p["mode"] == "range":
+            self.range_mode_radio.setChecked(True)
+        else:
+            self.sigfigs_mode_radio.setChecked(True)
 
-            return True
-        except Exception:
-            return False
+        toggles = p["toggles"]
+        self.toggle_flash_incorrect.setChecked(toggles["flash_incorrect"])
+        self.toggle_show_correct.setChecked(toggles["show_correct"])
+        self._on_show_correct_toggled(toggles["show_correct"])
+        self.toggle_show_problem_text.setChecked(toggles["show_problem_text"])
+        self.toggle_auto_advance.setChecked(toggles["auto_advance"])
+        self.toggle_adaptive.setChecked(toggles["adaptive"])
 
     def _on_save_clicked(self):
+        self.save_prefs_button.setText("Saving…")
         self._save_preferences_safely()
-        old = self.save_prefs_button.text()
-        self.save_prefs_button.setText("Saved!")
-        QTimer.singleShot(1200, lambda: self.save_prefs_button.setText(old))
 
-    def _save_preferences_safely(self):
-        try:
-            prefs = self._collect_preferences()
-            pth = _prefs_path()
-            with pth.open("w", encoding="utf-8") as f:
-                json.dump(prefs, f, indent=2)
-        except Exception:
-            pass
+    def _on_save_as_preset_clicked(self):
+        name, ok = QInputDialog.getText(self, "Save as preset", "Preset name:", text=self.prefs_store.active)
+        name = name.strip()
+        if ok and name:
+            self.save_prefs_button.setText("Saving…")
+            self._save_preferences_safely(name)
+
+    def _save_preferences_safely(self, name: str = None):
+        # Serialized here, written atomically on the store's thread; the result comes back via prefs_saved
+        prefs = self._collect_preferences()
+        self.prefs_store.put(name or self.prefs_store.active, prefs)
+        # Checked on save so a bad cap shows up here, not mid-game; the report is cached for start_game
+        from feasibility import analyze, describe
+        self.feasibility_label.setText(describe(analyze(Settings.from_prefs(prefs))))
+        self._refresh_preset_combo()
+        self.prefs_store.save().add_done_callback(
+            lambda fut: self.prefs_saved.emit("" if fut.exception() is None else str(fut.exception())))
+
+    def _on_prefs_saved(self, error: str):
+        if self.settings_panel is None:
+            return
+        self.save_prefs_button.setText("Save failed" if error else "Saved!")
+        self.save_prefs_button.setToolTip(error)
+        QTimer.singleShot(1200, lambda: self.save_prefs_button.setText("Save my choices"))
 
     def _load_preferences_if_any(self):
-        pth = _prefs_path()
-        if not pth.exists():
+        if self.prefs_store.load():
+            self._apply_preferences(self.prefs_store.current())
+        self._refresh_preset_combo()
+
+    # ---------------- Presets ----------------
+    def _refresh_preset_combo(self):
+        combo = self.preset_combo
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems(self.prefs_store.names())
+        combo.setCurrentText(self.prefs_store.active)
+        combo.blockSignals(False)
+
+    def _on_preset_selected(self, name: str):
+        # Presets are already parsed and normalized; switching only swaps the dict
+        if not name or name == self.prefs_store.active:
             return
-        try:
-            with pth.open("r", encoding="utf-8") as f:
-                prefs = json.load(f)
-            if not isinstance(prefs, dict):
-                return
-            self._apply_preferences(prefs)
-        except Exception:
-            pass
+        self._apply_preferences(self.prefs_store.select(name))
+        self.prefs_store.save()
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     trainer = ArithmeticTrainer()
     trainer.show()
+    seed = _argv_int("--seed")
+    if "--replay" in sys.argv:
+        trainer._on_replay_clicked()
+    elif seed is not None:
+        trainer.start_game(seed=seed)
     sys.exit(app.exec_())
@@ -0,0 +1,177 @@
+"""Compact exact decimal for the generation/grading hot path.
+
+Every operand the trainer produces is a finite decimal with a small exponent,
+so a plain ``(mantissa, exponent)`` pair of Python ints is enough to add,
+subtract, multiply and (exactly) divide them, count significant figures and
+format them, without going through the 100-digit Decimal context.
+"""
+import re
+from decimal import Decimal
+from math import gcd
+
+# Largest |exponent| accepted from user input; keeps 10**e bounded
+MAX_EXP = 1000
+
+_NUM_RE = re.compile(r'\s*([+-]?)(\d*)(?:\.(\d*))?(?:[eE]([+-]?\d+))?\s*\Z')
+
+
+class Num:
+    """Exact finite decimal ``m·10^e``, kept normalized (m has no trailing zeros; zero is 0·10^0)."""
+    __slots__ = ("m", "e")
+
+    def __init__(self, m: int, e: int = 0):
+        if m == 0:
+            e = 0
+        else:
+            while m % 10 == 0:
+                m //= 10
+                e += 1
+        self.m = m
+        self.e = e
+
+    @classmethod
+    def _raw(cls, m: int, e: int) -> "Num":
+        # Caller guarantees (m, e) is already normalized
+        n = object.__new__(cls)
+        n.m = m
+        n.e = e
+        return n
+
+    # ---------------- Conversion ----------------
+    @classmethod
+    def parse(cls, text: str) -> "Num":
+        """Parse a plain or scientific decimal literal; raise ValueError otherwise."""
+        mt = _NUM_RE.match(text)
+        if not mt or not (mt.group(2) or mt.group(3)):
+            raise ValueError(f"invalid number: {text!r}")
+        sign, ip, fp, ex = mt.groups()
+        fp = fp or ''
+        e = int(ex or 0) - len(fp)
+        if abs(e) > MAX_EXP:
+            raise ValueError(f"exponent out of range: {text!r}")
+        m = int(ip + fp or '0')
+        return cls(-m if sign == '-' else m, e)
+
+    @classmethod
+    def from_decimal(cls, d: Decimal) -> "Num":
+        sign, digits, e = d.as_tuple()
+        m = int(''.join(map(str, digits)) or '0')
+        return cls(-m if sign else m, e)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.m).scaleb(self.e)
+
+    # ---------------- Queries ----------------
+    def sigfigs(self) -> int:
+        return len(str(abs(self.m))) if self.m else 1
+
+    def decimal_places_leq_one(self) -> bool:
+        return self.e >= -1
+
+    def is_integer(self) -> bool:
+        return self.e >= 0
+
+    # ---------------- Arithmetic ----------------
+    def __add__(self, other: "Num") -> "Num":
+        if self.e == other.e:
+            return Num(self.m + other.m, self.e)
+        if self.e < other.e:
+            return Num(self.m + other.m * 10 ** (other.e - self.e), self.e)
+        return Num(self.m * 10 ** (self.e - other.e) + other.m, other.e)
+
+    def __neg__(self) -> "Num":
+        return Num._raw(-self.m, self.e)
+
+    def __abs__(self) -> "Num":
+        return Num._raw(abs(self.m), self.e)
+
+    def __sub__(self, other: "Num") -> "Num":
+        return self + (-other)
+
+    def __mul__(self, other: "Num") -> "Num":
+        return Num(self.m * other.m, self.e + other.e)
+
+    def div_exact(self, other: "Num"):
+        """Return self / other if it is a finite decimal, else None."""
+        if other.m == 0:
+            raise ZeroDivisionError("division by zero")
+        m1, m2 = self.m, other.m
+        if m1 % m2 == 0:
+            return Num(m1 // m2, self.e - other.e)
+        d = abs(m2) // gcd(m1, m2)
+        twos = fives = 0
+        while d % 2 == 0:
+            d //= 2
+            twos += 1
+        while d % 5 == 0:
+            d //= 5
+            fives += 1
+        if d != 1:
+            return None
+        k = max(twos, fives)
+        return Num(m1 * 10 ** k // m2, self.e - other.e - k)
+
+    def __truediv__(self, other: "Num") -> "Num":
+        q = self.div_exact(other)
+        if q is None:
+            raise ArithmeticError("quotient is not a finite decimal")
+        return q
+
+    # ---------------- Comparison ----------------
+    def _aligned(self, other):
+        if isinstance(other, int):
+            other = Num(other)
+        e = min(self.e, other.e)
+        return self.m * 10 ** (self.e - e), other.m * 10 ** (other.e - e)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, int):
+            other = Num(other)
+        if not isinstance(other, Num):
+            return NotImplemented
+        return self.m == other.m and self.e == other.e
+
+    def __hash__(self) -> int:
+        # Equal to an int means the same hash as that int (sets and dict keys mix them)
+        if self.e >= 0:
+            return hash(self.m * 10 ** self.e)
+        return hash((self.m, self.e))
+
+    def __lt__(self, other) -> bool:
+        a, b = self._aligned(other)
+        return a < b
+
+    def __le__(self, other) -> bool:
+        a, b = self._aligned(other)
+        return a <= b
+
+    def __gt__(self, other) -> bool:
+        a, b = self._aligned(other)
+        return a > b
+
+    def __ge__(self, other) -> bool:
+        a, b = self._aligned(other)
+        return a >= b
+
+    def __bool__(self) -> bool:
+        return self.m != 0
+
+    def __int__(self) -> int:
+        # Truncates toward zero, like int(Decimal)
+        if self.e >= 0:
+            return self.m * 10 ** self.e
+        q = abs(self.m) // 10 ** -self.e
+        return q if self.m >= 0 else -q
+
+    # ---------------- Formatting ----------------
+    def __str__(self) -> str:
+        # Plain notation without trailing zeros, same as format_num on a Decimal
+        m, e = self.m, self.e
+        if e >= 0:
+            return str(m * 10 ** e)
+        digits = str(abs(m)).rjust(1 - e, '0')
+        s = digits[:e] + '.' + digits[e:]
+        return '-' + s if m < 0 else s
+
+    def __repr__(self) -> str:
+        return f"Num({self.m}, {self.e})"
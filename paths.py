@@ -0,0 +1,42 @@
+"""Where the app keeps its files: next to the executable or the sources.
+
+Each *_path takes an optional base directory (a str or Path) instead, so
+benchmarks can keep their games out of the real logs.
+"""
+import sys
+from pathlib import Path
+
+
+def app_dir() -> Path:
+    if getattr(sys, 'frozen', False):
+        return Path(sys.executable).resolve().parent
+    base = Path(__file__).resolve().parent if '__file__' in globals() else Path(sys.argv[0]).resolve().parent
+    return base
+
+
+def prefs_path(base: Path = None) -> Path:
+    return Path(base or app_dir()) / "preferences.json"
+
+
+def attempts_path(base: Path = None) -> Path:
+    return Path(base or app_dir()) / "attempts.jsonl"
+
+
+def sessions_path(base: Path = None) -> Path:
+    return Path(base or app_dir()) / "sessions.jsonl"
+
+
+def weakness_path(base: Path = None) -> Path:
+    return Path(base or app_dir()) / "weakness.json"
+
+
+def startup_path(base: Path = None) -> Path:
+    return Path(base or app_dir()) / "startup.jsonl"
+
+
+def profile_path(base: Path = None) -> Path:
+    return Path(base or app_dir()) / "profile.json"
+
+
+def results_path(base: Path = None) -> Path:
+    return Path(base or app_dir()) / "results.sqlite3"
@@ -0,0 +1,250 @@
+"""Preferences as plain data.
+
+The dict layout is the one ``preferences.json`` has always used. The trainer
+keeps the live values here and only copies them into widgets when the
+preferences panel is actually open. ``PreferencesStore`` keeps named presets
+of these dicts on disk.
+"""
+import copy
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+from batch_writer import BatchWriter
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+DEFAULT_PREFS = {
+    "mode": "range",
+    "ops": {"+": True, "-": True, "*": True, "/": True},
+    "ranges": {"add_A": [2, 100], "add_B": [2, 100], "mul_X": [2, 12], "mul_Y": [2, 100]},
+    "weights": {"+": 3, "-": 3, "*": 3, "/": 3},
+    "sigfigs": {"A_sig": [2, 3], "A_exp": [-2, 3], "B_sig": [2, 3], "B_exp": [-2, 3]},
+    "max_solution_sigfigs": {"*": 4, "/": 4, "+": 5, "-": 5},
+    "game_time": 120,
+    "radio": {"range_checked": True, "sig_checked": False},
+    "toggles": {"flash_incorrect": True, "show_correct": True, "show_problem_text": False, "auto_advance": False,
+                "adaptive": False},
+}
+
+# Widget limits, shared with the spinboxes/sliders that edit each value
+LIMITS = {
+    "ranges": (1, 100),
+    "weights": (0, 5),
+    "sig": (1, 6),
+    "exp": (-6, 6),
+    "max_solution_sigfigs": (1, 20),
+    "game_time": (30, 600),
+}
+
+
+def default_prefs() -> dict:
+    return copy.deepcopy(DEFAULT_PREFS)
+
+
+def _clamp(v, lo: int, hi: int) -> int:
+    return max(lo, min(hi, int(v)))
+
+
+def _pair(pair, default, lo: int, hi: int):
+    if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+        return list(default)
+    return [_clamp(pair[0], lo, hi), _clamp(pair[1], lo, hi)]
+
+
+def normalize_prefs(prefs: dict) -> Optional[dict]:
+    """Return a complete, clamped copy of prefs, or None if it is unusable."""
+    try:
+        mode = prefs.get("mode", "range")
+        if mode not in ("range", "sigfigs"):
+            return None
+        d = DEFAULT_PREFS
+        ops = prefs.get("ops", {})
+        ranges = prefs.get("ranges", {})
+        weights = prefs.get("weights", {})
+        sfs = prefs.get("sigfigs", {})
+        maxsol = prefs.get("max_solution_sigfigs", {})
+        toggles = prefs.get("toggles", {})
+        show_correct = bool(toggles.get("show_correct", True))
+        return {
+            "mode": mode,
+            "ops": {op: bool(ops.get(op, True)) for op in d["ops"]},
+            "ranges": {k: _pair(ranges.get(k, v), v, *LIMITS["ranges"]) for k, v in d["ranges"].items()},
+            "weights": {op: _clamp(weights.get(op, v), *LIMITS["weights"]) for op, v in d["weights"].items()},
+            "sigfigs": {k: _pair(sfs.get(k, v), v, *LIMITS["sig" if k.endswith("_sig") else "exp"])
+                        for k, v in d["sigfigs"].items()},
+            "max_solution_sigfigs": {op: _clamp(maxsol.get(op, v), *LIMITS["max_solution_sigfigs"])
+                                     for op, v in d["max_solution_sigfigs"].items()},
+            "game_time": _clamp(prefs.get("game_time", d["game_time"]), *LIMITS["game_time"]),
+            "radio": {"range_checked": mode == "range", "sig_checked": mode == "sigfigs"},
+            "toggles": {
+                "flash_incorrect": bool(toggles.get("flash_incorrect", True)),
+                "show_correct": show_correct,
+                # No correct-answer feedback means no problem text either
+                "show_problem_text": bool(toggles.get("show_problem_text", False)) and show_correct,
+                "auto_advance": bool(toggles.get("auto_advance", False)),
+                "adaptive": bool(toggles.get("adaptive", False)),
+            },
+        }
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+# ---------------- Store ----------------
+def atomic_write(path: Path, text: str):
+    """Replace path with text via a fsynced temp file, so readers see old or new, never half."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+DEFAULT_PRESET = "default"
+
+BUILTIN_PRESETS = {
+    DEFAULT_PRESET: DEFAULT_PREFS,
+    "mental mult drill": {
+        "mode": "range",
+        "ops": {"+": False, "-": False, "*": True, "/": True},
+        "ranges": {"mul_X": [2, 12], "mul_Y": [2, 100]},
+        "game_time": 120,
+        "toggles": {"auto_advance": True, "adaptive": True},
+    },
+    "sig-fig physics": {
+        "mode": "sigfigs",
+        "sigfigs": {"A_sig": [2, 4], "A_exp": [-3, 3], "B_sig": [2, 4], "B_exp": [-3, 3]},
+        "max_solution_sigfigs": {"*": 4, "/": 4, "+": 5, "-": 5},
+        "game_time": 180,
+    },
+}
+
+class PreferencesStore:
+    """Named presets in ``preferences.json``.
+
+    The file is parsed at most once per change on disk (cached by mtime and
+    size). ``save`` serializes on the caller's thread and hands the text to a
+    daemon writer, which replaces the file atomically (temp file, fsync,
+    rename); the returned Future carries any error. A file in the old
+    single-dict layout is read as the "default" preset.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.presets = {name: normalize_prefs(p) for name, p in BUILTIN_PRESETS.items()}
+        self.active = DEFAULT_PRESET
+        self.loaded = False  # a valid file has been read
+        self._stamp = None
+        self._writer = BatchWriter(self._write_batch, "prefs-writer")
+
+    # Reading
+    def load(self) -> bool:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return self.loaded
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return self.loaded
+        self._stamp = stamp
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self.loaded
+        self.loaded = self._read(data) or self.loaded
+        return self.loaded
+
+    def _read(self, data) -> bool:
+        if not isinstance(data, dict):
+            return False
+        if "presets" not in data:
+            prefs = normalize_prefs(data)
+            if prefs is None:
+                return False
+            self.presets[DEFAULT_PRESET] = prefs
+            self.active = DEFAULT_PRESET
+            return True
+        presets = data["presets"]
+        if not isinstance(presets, dict):
+            return False
+        for name, p in presets.items():
+            prefs = normalize_prefs(p) if isinstance(p, dict) else None
+            if prefs is not None:
+                self.presets[str(name)] = prefs
+        active = data.get("active")
+        self.active = active if active in self.presets else DEFAULT_PRESET
+        return True
+
+    def names(self) -> List[str]:
+        return list(self.presets)
+
+    def current(self) -> dict:
+        return self.presets[self.active]
+
+    def select(self, name: str) -> dict:
+        self.active = name
+        return self.presets[name]
+
+    def put(self, name: str, prefs: dict) -> bool:
+        prefs = normalize_prefs(prefs)
+        if prefs is None:
+            return False
+        self.presets[name] = prefs
+        self.active = name
+        return True
+
+    # Writing
+    def save(self) -> "Future":
+        text = json.dumps({"version": 2, "active": self.active, "presets": self.presets}, indent=2)
+        return self._writer.submit(text)
+
+    def close(self, timeout: float = 2.0):
+        self._writer.close(timeout)
+
+    def _write_batch(self, jobs):
+        # Only the newest snapshot matters; older ones are superseded
+        error = self._write(jobs[-1][0])
+        for _, fut in jobs:
+            if error is None:
+                fut.set_result(self.path)
+            else:
+                fut.set_exception(error)
+
+    def _write(self, text: str) -> Optional[OSError]:
+        try:
+            atomic_write(self.path, text)
+            st = self.path.stat()
+        except OSError as e:
+            return e
+        # Our own write must not trigger a re-parse
+        self._stamp = (st.st_mtime_ns, st.st_size)
+        self.loaded = True
+        return None
+
+
+def load_preset(path: Path, preset: str = None, required: bool = False) -> dict:
+    """The active preset in path, or the named one, for the command-line tools.
+
+    A missing or unreadable file gives the defaults unless required. Raises
+    ValueError when it is required and unreadable, or the preset doesn't exist.
+    """
+    store = PreferencesStore(path)
+    if not store.load() and required:
+        raise ValueError(f"cannot read preferences from {path}")
+    if preset is not None:
+        if preset not in store.presets:
+            raise ValueError(f"no preset {preset!r} (have: {', '.join(store.names())})")
+        store.select(preset)
+    return store.current()
@@ -0,0 +1,92 @@
+"""Background problem prefetching.
+
+A daemon worker keeps a small buffer of problems generated from the current
+``ProblemGenerator`` so the GUI thread only has to pop the next one after an
+answer is graded. ``reset`` swaps in a new generator and drops anything that
+was generated for the old settings.
+
+Only one thread ever draws from a given generator, so a seeded generator's
+stream comes out in order: on a miss the GUI thread waits for the worker's
+problem rather than generating one itself (unless ``depth`` is 0).
+"""
+import threading
+from collections import deque
+from typing import Optional
+
+from generator import Problem, ProblemGenerator
+
+
+class ProblemPrefetcher:
+    def __init__(self, depth: int = 8):
+        self.depth = depth
+        self.hits = 0
+        self.misses = 0
+        self._buf = deque()
+        self._generator: Optional[ProblemGenerator] = None
+        self._epoch = 0
+        self._stopped = False
+        self._failed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="problem-prefetch", daemon=True)
+        self._thread.start()
+
+    def reset(self, generator: ProblemGenerator):
+        """Flush the buffer and start prefetching from generator."""
+        with self._cond:
+            self._generator = generator
+            self._epoch += 1
+            self._buf.clear()
+            self.hits = self.misses = 0
+            self._cond.notify_all()
+
+    def next(self) -> Optional[Problem]:
+        """Pop a prefetched problem, waiting for the worker when the buffer is empty."""
+        with self._cond:
+            if self._buf:
+                self.hits += 1
+                self._cond.notify_all()
+                return self._buf.popleft()
+            self.misses += 1
+            gen = self._generator
+            while not self._buf and self._worker_serves(gen):
+                self._cond.wait()
+            if self._buf:
+                self._cond.notify_all()
+                return self._buf.popleft()
+        return gen.generate() if gen is not None else None
+
+    def _worker_serves(self, gen) -> bool:
+        return (self.depth > 0 and not (self._stopped or self._failed)
+                and gen is not None and bool(gen.settings.ops))
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"hits": self.hits, "misses": self.misses, "buffered": len(self._buf)}
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and (self._generator is None or not self._generator.settings.ops
+                                             or len(self._buf) >= self.depth):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                gen, epoch = self._generator, self._epoch
+            try:
+                problem = gen.generate()
+            except Exception:
+                # Hand generation back to the caller, where the error will surface
+                with self._cond:
+                    self._failed = True
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                if epoch == self._epoch:  # settings unchanged while we were generating
+                    self._buf.append(problem)
+                    self._cond.notify_all()
@@ -0,0 +1,128 @@
+"""Opt-in per-game profiling.
+
+Enabled with ``--profile`` or ``TRAINER_PROFILE=1``. Each game then runs
+under cProfile (GUI thread) and keeps hot-path counters: draws per
+generated problem by mode and operator, fallbacks that broke the caps,
+answer flashes and time spent grading. ``finish`` writes them, the
+formatting-table and prefetch-buffer hit rates and the top of the profile
+to ``profile.json``, plus the raw profile to ``profile.prof`` for
+pstats/snakeviz.
+
+When it is off nothing here is imported beyond the flag check, and the hot
+paths only test ``counters is None``.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from preferences import atomic_write
+
+ENV_VAR = "TRAINER_PROFILE"
+FLAG = "--profile"
+TOP_FUNCTIONS = 40
+
+
+def profile_requested(argv) -> bool:
+    return FLAG in argv or os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+class HotPathCounters:
+    """Counters bumped from the GUI thread and the prefetch thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.generate: Dict[str, list] = {}  # "mode op" -> [problems, draws, most draws, fallbacks]
+        self.calls: Dict[str, int] = {}
+        self.timers: Dict[str, list] = {}    # name -> [calls, total ns, max ns]
+
+    def generated(self, mode: str, op: str, draws: int, fallback: bool):
+        with self._lock:
+            c = self.generate.get(f"{mode} {op}")
+            if c is None:
+                c = self.generate[f"{mode} {op}"] = [0, 0, 0, 0]
+            c[0] += 1
+            c[1] += draws
+            c[2] = max(c[2], draws)
+            c[3] += fallback
+
+    def count(self, name: str):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def timed(self, name: str, ns: int):
+        with self._lock:
+            t = self.timers.get(name)
+            if t is None:
+                t = self.timers[name] = [0, 0, 0]
+            t[0] += 1
+            t[1] += ns
+            t[2] = max(t[2], ns)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "generate": {k: {"problems": n, "draws": d, "draws_per_problem": round(d / n, 3),
+                                 "max_draws": m, "fallbacks": f}
+                             for k, (n, d, m, f) in sorted(self.generate.items())},
+                "calls": dict(sorted(self.calls.items())),
+                "timers": {k: {"calls": n, "total_ms": round(t / 1e6, 3), "mean_us": round(t / n / 1e3, 2),
+                               "max_us": round(mx / 1e3, 2)}
+                           for k, (n, t, mx) in sorted(self.timers.items())},
+            }
+
+
+def _prefetch_report(stats: dict) -> dict:
+    served = stats["hits"] + stats["misses"]
+    return dict(stats, hit_rate=round(stats["hits"] / served, 4) if served else None)
+
+
+class GameProfiler:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.counters: Optional[HotPathCounters] = None
+        self._profile = None
+
+    def start(self):
+        import cProfile
+        self.stop()
+        self.counters = HotPathCounters()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+
+    def finish(self, session: dict = None, prefetch: dict = None) -> Optional[dict]:
+        """Stop profiling this game and write the report; returns it, or None if no game was profiled.
+
+        prefetch is ``ProblemPrefetcher.stats()`` for the game, read before the next ``reset`` clears it.
+        """
+        if self._profile is None:
+            return None
+        import pstats
+        from generator import format_cache_stats
+        self._profile.disable()
+        stats = pstats.Stats(self._profile)
+        top = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:TOP_FUNCTIONS]
+        report = {
+            "ts": time.time(),
+            "session": {k: session[k] for k in ("actual_s", "score", "attempts", "settings", "seed") if k in session}
+            if session else {},
+            **self.counters.to_dict(),
+            "format_cache": format_cache_stats(),
+            "prefetch": _prefetch_report(prefetch) if prefetch else {},
+            "profile_top": [{"function": f"{Path(file).name}:{line}({name})", "calls": nc,
+                             "tottime_ms": round(tt * 1e3, 3), "cumtime_ms": round(ct * 1e3, 3)}
+                            for (file, line, name), (_, nc, tt, ct, _) in top],
+        }
+        try:
+            atomic_write(self.path, json.dumps(report, indent=2))
+            stats.dump_stats(str(self.path.with_suffix(".prof")))
+        except OSError:
+            pass  # the report is still returned to the caller
+        self._profile = None
+        return report
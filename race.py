@@ -0,0 +1,293 @@
+"""Local race server: one timed game for many clients over TCP.
+
+    python race.py [--host 127.0.0.1] [--port 8765] [--preset NAME] [--seed N]
+                   [--time SECONDS] [--lobby SECONDS] [--players N]
+
+Every message is one JSON object per line. A client sends
+``{"type": "join", "name": ...}`` and then ``{"type": "answer", "i": ..., "text": ...}``
+for the problem it was last sent. The server sends ``welcome``, ``start``,
+``problem``, ``result``, ``invalid``, ``leaderboard`` and finally ``end``.
+
+All players walk the same seeded problem stream at their own pace: problem
+i is generated once, the first time any player reaches it. Answers are
+graded here with ``Problem.grade``, the same exact check as the window. The
+game starts when the lobby time runs out or ``--players`` have joined, and a
+leaderboard is pushed to everyone at most every LEADERBOARD_S while scores
+change. Everything runs on one event loop thread; a client whose unsent
+output backs up past SEND_LIMIT is dropped rather than buffered forever.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from feasibility import analyze, describe, playable
+from game_clock import GameClock
+from generator import Problem, ProblemGenerator, Settings
+from paths import prefs_path
+from preferences import load_preset
+
+LEADERBOARD_S = 0.5
+LEADERBOARD_TOP = 10
+LINE_LIMIT = 4096        # longest accepted client line, bytes
+SEND_LIMIT = 256 * 1024  # unsent bytes before a client counts as stalled
+NAME_LEN = 24
+
+
+def encode(msg: dict) -> bytes:
+    return json.dumps(msg, separators=(",", ":")).encode() + b"\n"
+
+
+class Player:
+    __slots__ = ("id", "name", "writer", "index", "score", "attempts", "last_ok_ns", "connected")
+
+    def __init__(self, pid: int, name: str, writer: asyncio.StreamWriter):
+        self.id = pid
+        self.name = name
+        self.writer = writer
+        self.index = 0          # problem this player is on
+        self.score = 0
+        self.attempts = 0
+        self.last_ok_ns = 0     # ties on score go to whoever got there first
+        self.connected = True
+
+    def rank_key(self):
+        return -self.score, self.attempts - self.score, self.last_ok_ns, self.id
+
+
+class Race:
+    def __init__(self, settings: Settings, seed: int, game_time: float, players: Optional[int] = None):
+        self.settings = settings
+        self.seed = seed
+        self.game_time = game_time
+        self.want_players = players
+        self.generator = ProblemGenerator(settings, rng=random.Random(seed))
+        self.problems: List[Problem] = []
+        self.players: Dict[int, Player] = {}
+        self.clock = GameClock()
+        self.state = "lobby"
+        self.full: Optional[asyncio.Event] = None  # made on the serving loop, see serve
+        self._next_id = 1
+        self._dirty = False
+        self.answers = 0
+
+    def problem(self, i: int) -> Problem:
+        while len(self.problems) <= i:
+            self.problems.append(self.generator.generate())
+        return self.problems[i]
+
+    # ---------------- Sending ----------------
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, data: bytes) -> bool:
+        """Queue data unless the peer has stopped reading (SEND_LIMIT already buffered); False means drop it."""
+        transport = writer.transport
+        if transport.is_closing() or transport.get_write_buffer_size() > SEND_LIMIT:
+            return False
+        writer.write(data)
+        return True
+
+    def send(self, player: Player, data: bytes):
+        if player.connected and not self._write(player.writer, data):
+            self.drop(player)
+
+    def _reply(self, player: Optional[Player], writer: asyncio.StreamWriter, data: bytes) -> bool:
+        """Answer a connection that may not have joined yet; False once it is over the send limit."""
+        if player is not None:
+            self.send(player, data)
+            return player.connected
+        return self._write(writer, data)
+
+    def broadcast(self, data: bytes):
+        # Encoded once, written to every socket
+        for player in list(self.players.values()):
+            self.send(player, data)
+
+    def drop(self, player: Player):
+        if player.connected:
+            player.connected = False
+            player.writer.close()
+
+    def _problem_msg(self, i: int) -> bytes:
+        p = self.problem(i)
+        return encode({"type": "problem", "i": i, "text": p.text, "op": p.op, "n1": str(p.n1), "n2": str(p.n2)})
+
+    def standings(self) -> List[Player]:
+        return sorted(self.players.values(), key=Player.rank_key)
+
+    def _leaderboard_msg(self, top: int = LEADERBOARD_TOP) -> dict:
+        ranked = self.standings()
+        return {"type": "leaderboard", "players": len(ranked),
+                "top": [[p.name, p.score, p.attempts] for p in ranked[:top]]}
+
+    # ---------------- Protocol ----------------
+    def join(self, msg: dict, writer: asyncio.StreamWriter) -> Player:
+        name = str(msg.get("name") or "").strip()[:NAME_LEN] or f"player{self._next_id}"
+        player = Player(self._next_id, name, writer)
+        self._next_id += 1
+        self.players[player.id] = player
+        self.send(player, encode({"type": "welcome", "id": player.id, "name": name, "seed": self.seed,
+                                  "settings": self.settings.digest(), "time": self.game_time,
+                                  "state": self.state}))
+        if self.state == "running":
+            # Late joiners play whatever time is left, from problem 0
+            self._start_player(player)
+        if self.want_players and len(self.players) >= self.want_players and self.full is not None:
+            self.full.set()
+        self._dirty = True
+        return player
+
+    def _start_player(self, player: Player):
+        self.send(player, encode({"type": "start", "remaining": self.clock.remaining_ns() / 1e9})
+                  + self._problem_msg(player.index))
+
+    def answer(self, player: Player, msg: dict):
+        if self.state != "running" or self.clock.expired():
+            return  # answers after the deadline don't count
+        i = msg.get("i")
+        if i != player.index:
+            self.send(player, encode({"type": "error", "error": "stale", "i": player.index}))
+            return
+        p = self.problem(i)
+        graded = p.grade(str(msg.get("text", "")))
+        if graded is None:
+            self.send(player, encode({"type": "invalid", "i": i}))
+            return
+        ok, user_str = graded
+        player.attempts += 1
+        self.answers += 1
+        if ok:
+            player.score += 1
+            player.last_ok_ns = time.monotonic_ns()
+        player.index += 1
+        self._dirty = True
+        self.send(player, encode({"type": "result", "i": i, "ok": ok, "user": user_str,
+                                  "correct": p.answer_text, "score": player.score})
+                  + self._problem_msg(player.index))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        player = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                    kind = msg.get("type")
+                except (ValueError, AttributeError):
+                    if not self._reply(player, writer, encode({"type": "error", "error": "bad message"})):
+                        break
+                    continue
+                if kind == "answer" and player is not None:
+                    self.answer(player, msg)
+                elif kind == "join" and player is None and self.state != "over":
+                    player = self.join(msg, writer)
+                elif kind == "leave":
+                    break
+                elif not self._reply(player, writer, encode({"type": "error", "error": f"unexpected {kind!r}"})):
+                    break
+        except (ConnectionError, ValueError):
+            pass  # reset, or a line longer than LINE_LIMIT
+        finally:
+            if player is not None:
+                # Keep the score on the board; just stop sending to it
+                self.drop(player)
+            else:
+                writer.close()
+
+    # ---------------- Game ----------------
+    async def _push_leaderboard(self):
+        while self.state == "running":
+            await asyncio.sleep(LEADERBOARD_S)
+            if self._dirty:
+                self._dirty = False
+                self.broadcast(encode(self._leaderboard_msg()))
+
+    async def run(self, lobby: float) -> dict:
+        try:
+            await asyncio.wait_for(self.full.wait(), lobby)
+        except asyncio.TimeoutError:
+            pass
+        self.state = "running"
+        self.clock.start(self.game_time)
+        for player in list(self.players.values()):
+            self._start_player(player)
+        pusher = asyncio.ensure_future(self._push_leaderboard())
+        while not self.clock.expired():
+            await asyncio.sleep(self.clock.remaining_ns() / 1e9)
+        self.state = "over"
+        timing = self.clock.finish()
+        await pusher
+        board = self._leaderboard_msg(top=len(self.players))
+        self.broadcast(encode(dict(board, type="end", timing=timing)))
+        for player in list(self.players.values()):
+            self.drop(player)
+        return dict(timing, seed=self.seed, settings=self.settings.digest(), answers=self.answers,
+                    standings=board["top"])
+
+
+def format_standings(result: dict) -> str:
+    lines = [f"Seed: {result['seed']} (settings {result['settings']})",
+             f"Game length: {result['actual_s']:.2f} s (drift {result['drift_ms']:+.0f} ms), "
+             f"{result['answers']} answers", ""]
+    width = max([len(name) for name, _, _ in result["standings"]] + [6])
+    lines.append(f"{'#':>4}  {'Player'.ljust(width)}  Correct  Answered")
+    for rank, (name, score, attempts) in enumerate(result["standings"], 1):
+        lines.append(f"{rank:>4}  {name.ljust(width)}  {score:>7}  {attempts:>8}")
+    return "\n".join(lines)
+
+
+async def serve(race: Race, host: str, port: int, lobby: float) -> dict:
+    race.full = asyncio.Event()  # bound to this loop (Python < 3.10 binds at construction)
+    server = await asyncio.start_server(race.handle, host, port, limit=LINE_LIMIT, backlog=1024)
+    addr = server.sockets[0].getsockname()
+    print(f"race: listening on {addr[0]}:{addr[1]}, seed {race.seed}, settings {race.settings.digest()}, "
+          f"starting in {lobby:g} s" + (f" or at {race.want_players} players" if race.want_players else ""),
+          file=sys.stderr, flush=True)
+    async with server:
+        result = await race.run(lobby)
+        server.close()
+        await asyncio.sleep(0)  # let the closes go out
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--prefs", default=None, help="preferences.json (default: the app's)")
+    ap.add_argument("--preset", help="named preset (default: the active one)")
+    ap.add_argument("--seed", type=lambda s: int(s, 0), help="problem stream seed (default: random)")
+    ap.add_argument("--time", type=float, help="game length in seconds (default: from preferences)")
+    ap.add_argument("--lobby", type=float, default=30.0, help="seconds to wait for players (default: 30)")
+    ap.add_argument("--players", type=int, help="start as soon as this many have joined")
+    args = ap.parse_args(argv)
+
+    try:
+        prefs = load_preset(args.prefs or prefs_path(), args.preset)
+    except ValueError as e:
+        raise SystemExit(f"race: {e}")
+    settings = Settings.from_prefs(prefs)
+    if not settings.ops:
+        raise SystemExit("race: no operation is enabled in these settings")
+    # Adaptive targeting follows one player's history, so a shared race uses the plain draw
+    if settings.adaptive:
+        settings = Settings.from_dict(dict(settings.to_dict(), adaptive=False))
+    report = analyze(settings)
+    if describe(report):
+        print("race: " + describe(report).replace("\n", "\nrace: "), file=sys.stderr)
+    settings = playable(settings, report)
+    seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(32)
+    race = Race(settings, seed, args.time if args.time is not None else prefs["game_time"], args.players)
+    try:
+        result = asyncio.run(serve(race, args.host, args.port, args.lobby))
+    except KeyboardInterrupt:
+        return 1
+    print(format_standings(result))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Long-term results in SQLite next to preferences.json.
+
+    python results.py accuracy --op '*' --operand 7 --days 30
+    python results.py slowest -n 50
+    python results.py import attempts.jsonl
+
+Every graded attempt of a game is written in one transaction when the game
+ends, on a daemon writer thread (``BatchWriter``) with its own
+connection; ``save_game`` returns a Future, resolved once the transaction
+has committed. Reads use a separate connection on the caller's thread
+(the database is in WAL mode, so they never wait on a write). Operands are
+kept exactly as text and as REAL for the indexes on (op, operand, ts),
+(op, ts), ts and response time, so accuracy per operator or operand over
+a date range and "slowest N" are index-only lookups whatever the table
+size. History pages are keyset-paginated on the row id.
+"""
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple
+
+from batch_writer import BatchWriter
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id       INTEGER PRIMARY KEY,
+    ts       REAL NOT NULL,
+    client   TEXT NOT NULL,
+    mode     TEXT,
+    settings TEXT,
+    seed     INTEGER,
+    score    INTEGER,
+    attempts INTEGER,
+    actual_s REAL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id         INTEGER PRIMARY KEY,
+    session_id INTEGER REFERENCES sessions(id),
+    ts         REAL NOT NULL,
+    mode       TEXT NOT NULL,
+    op         TEXT NOT NULL,
+    n1         TEXT NOT NULL,
+    n2         TEXT NOT NULL,
+    v1         REAL NOT NULL,
+    v2         REAL NOT NULL,
+    correct    TEXT NOT NULL,
+    user       TEXT NOT NULL,
+    ok         INTEGER NOT NULL,
+    ns         INTEGER
+);
+CREATE INDEX IF NOT EXISTS attempts_op_v1_ts ON attempts (op, v1, ts, ok);
+CREATE INDEX IF NOT EXISTS attempts_op_v2_ts ON attempts (op, v2, ts, ok);
+CREATE INDEX IF NOT EXISTS attempts_op_ts ON attempts (op, ts, ok);
+CREATE INDEX IF NOT EXISTS attempts_ts ON attempts (ts);
+CREATE INDEX IF NOT EXISTS attempts_ns ON attempts (ns);
+"""
+
+# Column order of an attempt row as save_game takes it and page() returns it (after id)
+ATTEMPT_COLUMNS = ("ts", "mode", "op", "n1", "n2", "correct", "user", "ok", "ns")
+PAGE_SIZE = 200
+DAY_S = 86400
+
+
+def attempt_row(record: dict, mode: str) -> tuple:
+    """An attempts.jsonl-style record as a save_game row."""
+    return (record["ts"], mode, record["op"], record["n1"], record["n2"], record["correct"], record["user"],
+            bool(record["ok"]), record.get("ns"))
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL: a crash can lose the last game, never corrupt
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class ResultsStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._reader = None
+        self._reader_thread = None
+        self._conn = None  # the writer thread's connection
+        self._writer = BatchWriter(self._write_batch, "results-writer")
+
+    # Writing
+    def save_game(self, session: dict, rows: Sequence[tuple], client: str = "window") -> "Future":
+        """Queue one game: its session record and attempt rows (see attempt_row), as a single transaction."""
+        return self._writer.submit((session, list(rows), client))
+
+    def close(self, timeout: float = 5.0):
+        if self._writer.active:
+            self._writer.put(None)  # the writer closes its connection; a later save reopens it
+        self._writer.close(timeout)
+        if self._reader is not None and self._reader_thread == threading.get_ident():
+            self._reader.close()
+            self._reader = None
+
+    def _write_batch(self, jobs):
+        for job in jobs:
+            if job is None:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                continue
+            (session, rows, client), fut = job
+            try:
+                if self._conn is None:
+                    self._conn = _connect(self.path)
+                with self._conn:  # commits on exit, or rolls the whole game back
+                    sid = _insert_game(self._conn, session, rows, client)
+            except Exception as e:  # handed to the caller; the writer must outlive a bad game
+                fut.set_exception(e)
+            else:
+                fut.set_result(sid)
+
+    # Reading (on the caller's thread)
+    def _read(self) -> sqlite3.Connection:
+        if self._reader is None:
+            self._reader = _connect(self.path)
+            self._reader_thread = threading.get_ident()
+        return self._reader
+
+    def count(self) -> int:
+        return self._read().execute("SELECT count(*) FROM attempts").fetchone()[0]
+
+    def page(self, before_id: Optional[int] = None, limit: int = PAGE_SIZE) -> List[tuple]:
+        """Newest-first (id, *ATTEMPT_COLUMNS) rows older than before_id."""
+        cols = ", ".join(("id",) + ATTEMPT_COLUMNS)
+        if before_id is None:
+            return self._read().execute(f"SELECT {cols} FROM attempts ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return self._read().execute(f"SELECT {cols} FROM attempts WHERE id < ? ORDER BY id DESC LIMIT ?",
+                                    (before_id, limit)).fetchall()
+
+    def accuracy(self, op: str, operand: float = None, days: float = None) -> Tuple[int, int]:
+        """(attempts, correct) for op, optionally with operand on either side and within the last days."""
+        since = time.time() - days * DAY_S if days is not None else float("-inf")
+        if operand is None:
+            sql = "SELECT count(*), coalesce(sum(ok), 0) FROM attempts WHERE op = ? AND ts >= ?"
+            return tuple(self._read().execute(sql, (op, since)).fetchone())
+        # One index range per side, answered from the index alone; UNION on id counts 7 × 7 once
+        sql = ("SELECT count(*), coalesce(sum(ok), 0) FROM ("
+               "SELECT id, ok FROM attempts WHERE op = ? AND v1 = ? AND ts >= ? "
+               "UNION SELECT id, ok FROM attempts WHERE op = ? AND v2 = ? AND ts >= ?)")
+        return tuple(self._read().execute(sql, (op, operand, since, op, operand, since)).fetchone())
+
+    def slowest(self, n: int = 50) -> List[tuple]:
+        """(ns, ts, problem text, user, correct, ok) of the n slowest answers ever."""
+        sql = ("SELECT ns, ts, n1 || ' ' || op || ' ' || n2, user, correct, ok FROM attempts "
+               "WHERE ns IS NOT NULL ORDER BY ns DESC LIMIT ?")
+        return self._read().execute(sql, (n,)).fetchall()
+
+
+def _insert_game(conn: sqlite3.Connection, session: dict, rows: List[tuple], client: str) -> int:
+    spec = session.get("settings_spec") or {}
+    cur = conn.execute(
+        "INSERT INTO sessions (ts, client, mode, settings, seed, score, attempts, actual_s) VALUES (?,?,?,?,?,?,?,?)",
+        (session.get("ts", time.time()), client, spec.get("mode"), session.get("settings"), session.get("seed"),
+         session.get("score"), session.get("attempts", len(rows)), session.get("actual_s")))
+    sid = cur.lastrowid
+    conn.executemany(
+        "INSERT INTO attempts (session_id, ts, mode, op, n1, n2, v1, v2, correct, user, ok, ns) "
+        "VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+        ((sid, ts, mode, op, n1, n2, float(n1), float(n2), correct, user, int(ok), ns)
+         for ts, mode, op, n1, n2, correct, user, ok, ns in rows))
+    return sid
+
+
+def import_jsonl(store: ResultsStore, records: Iterable[dict], mode: str = "range") -> int:
+    """Load attempts.jsonl records as one imported session; returns the number of rows."""
+    rows = [attempt_row(r, mode) for r in records if {"op", "n1", "n2", "ts", "ok"} <= r.keys()]
+    if rows:
+        store.save_game({"ts": rows[0][0], "attempts": len(rows)}, rows, client="import").result()
+    return len(rows)
+
+
+def main(argv=None):
+    from paths import results_path
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--db", default=None, help="database file (default: results.sqlite3 next to preferences.json)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    acc = sub.add_parser("accuracy", help="accuracy for an operator, optionally one operand and a date window")
+    acc.add_argument("--op", required=True, choices=("+", "-", "*", "/"))
+    acc.add_argument("--operand", type=float)
+    acc.add_argument("--days", type=float)
+    slow = sub.add_parser("slowest", help="slowest answers ever")
+    slow.add_argument("-n", type=int, default=50)
+    imp = sub.add_parser("import", help="load an attempts.jsonl log")
+    imp.add_argument("jsonl")
+    imp.add_argument("--mode", default="range", choices=("range", "sigfigs"),
+                     help="mode to record (the log doesn't store it)")
+    args = ap.parse_args(argv)
+
+    store = ResultsStore(args.db or results_path())
+    t0 = time.perf_counter()
+    if args.cmd == "accuracy":
+        n, ok = store.accuracy(args.op, args.operand, args.days)
+        print(f"{ok}/{n} correct" + (f" ({ok / n:.1%})" if n else ""))
+    elif args.cmd == "slowest":
+        for ns, ts, problem, user, correct, ok in store.slowest(args.n):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
+            print(f"{ns / 1e9:7.2f} s  {when}  {problem} = {correct}" + ("" if ok else f"  (you: {user})"))
+    else:
+        from attempt_log import read_attempts
+        print(f"imported {import_jsonl(store, read_attempts(Path(args.jsonl)), args.mode)} attempts")
+    store.close()
+    print(f"({(time.perf_counter() - t0) * 1000:.1f} ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
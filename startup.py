@@ -0,0 +1,43 @@
+"""Cold-start timing helpers.
+
+Times are on the ``time.perf_counter`` clock so they can be subtracted from
+stamps taken inside the app. The process start is read from ``/proc``; where
+that is unavailable (Windows, macOS) it is reported as unknown rather than
+guessed.
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+ENV_VAR = "TRAINER_STARTUP_REPORT"
+FLAG = "--startup-report"
+
+
+def process_start() -> Optional[float]:
+    """perf_counter value at which this process was started, or None if unknown."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        now = time.perf_counter()
+        # Field 22 (starttime, in clock ticks since boot); comm may contain spaces
+        start_ticks = int(stat[stat.rindex(b")") + 2:].split()[19])
+        age = uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return now - max(0.0, age)
+
+
+def report_requested(argv) -> bool:
+    return FLAG in argv or os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+def append_report(path: Path, report: dict):
+    try:
+        with Path(path).open("a", encoding="utf-8") as f:
+            f.write(json.dumps(report, separators=(",", ":")) + "\n")
+    except OSError:
+        pass  # the caller has already printed the report to stderr
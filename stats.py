@@ -0,0 +1,123 @@
+"""Session statistics over the attempt history."""
+from typing import Dict, List, Sequence, Tuple
+
+from generator import OPS
+from numeric import Num
+
+OP_SYMBOLS = {'+': '+', '-': '−', '*': '×', '/': '÷'}
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty sequence."""
+    k = max(0, min(len(sorted_values) - 1, int(-(-p * len(sorted_values) // 100)) - 1))
+    return sorted_values[k]
+
+
+def latency_summary(history: List[dict], ps=(50, 90, 99)) -> Dict[str, Tuple[int, List[float]]]:
+    """op -> (attempts, [seconds at each percentile]) for every operator that was answered."""
+    per_op = {}
+    for h in history:
+        if "ns" in h:
+            per_op.setdefault(h["op"], []).append(h["ns"])
+    out = {}
+    for op in OPS:
+        samples = per_op.get(op)
+        if samples:
+            samples.sort()
+            out[op] = (len(samples), [percentile(samples, p) / 1e9 for p in ps])
+    return out
+
+
+def format_latency_summary(summary) -> str:
+    lines = ["Response time p50 / p90 / p99:"] if summary else []
+    for op, (n, secs) in summary.items():
+        lines.append(f"{OP_SYMBOLS[op]}  " + " / ".join(f"{s:.2f} s" for s in secs) + f"  ({n})")
+    return "\n".join(lines)
+
+
+# ---------------- Running aggregates ----------------
+def magnitude(n: Num) -> int:
+    """Decade of |n|: 0 for 1–9, 1 for 10–99, -1 for 0.1–0.99...; zero counts as 0."""
+    return len(str(abs(n.m))) - 1 + n.e if n.m else 0
+
+
+def magnitude_label(k: int) -> str:
+    if k >= 0:
+        return f"{10 ** k}–{10 ** (k + 1) - 1}"
+    return f"{Num(1, k)}–{Num(1, k + 1)}"
+
+
+class Tally:
+    __slots__ = ("attempts", "correct", "streak", "best_streak")
+
+    def __init__(self):
+        self.attempts = 0
+        self.correct = 0
+        self.streak = 0        # correct answers in a row, up to the latest
+        self.best_streak = 0
+
+    def add(self, ok: bool):
+        self.attempts += 1
+        if ok:
+            self.correct += 1
+            self.streak += 1
+            if self.streak > self.best_streak:
+                self.best_streak = self.streak
+        else:
+            self.streak = 0
+
+    @property
+    def incorrect(self) -> int:
+        return self.attempts - self.correct
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.attempts if self.attempts else 0.0
+
+
+class SessionStats:
+    """Per-operator and per-operand-size aggregates, updated in O(1) per answer.
+
+    Readable at any point of a game; nothing here rescans the history.
+    Buckets are keyed by (op, magnitude(n1), magnitude(n2)), so there are
+    only a handful per operator whatever the game length.
+    """
+
+    def __init__(self):
+        self.total = Tally()
+        self.ops: Dict[str, Tally] = {}
+        self.buckets: Dict[Tuple[str, int, int], List[int]] = {}  # -> [attempts, errors]
+
+    def record(self, op: str, n1: Num, n2: Num, ok: bool):
+        self.total.add(ok)
+        tally = self.ops.get(op)
+        if tally is None:
+            tally = self.ops[op] = Tally()
+        tally.add(ok)
+        key = (op, magnitude(n1), magnitude(n2))
+        b = self.buckets.get(key)
+        if b is None:
+            b = self.buckets[key] = [0, 0]
+        b[0] += 1
+        b[1] += not ok
+
+    def most_missed(self, k: int = 3) -> List[Tuple[str, int, int, int, int]]:
+        """Up to k (op, magnitude 1, magnitude 2, errors, attempts) with errors, most errors first."""
+        missed = [(op, m1, m2, e, n) for (op, m1, m2), (n, e) in self.buckets.items() if e]
+        missed.sort(key=lambda r: (-r[3], -r[3] / r[4]))
+        return missed[:k]
+
+
+def format_session_stats(stats: SessionStats) -> str:
+    if not stats.total.attempts:
+        return ""
+    lines = [f"Best streak: {stats.total.best_streak}"]
+    for op in OPS:
+        t = stats.ops.get(op)
+        if t is not None:
+            lines.append(f"{OP_SYMBOLS[op]}  {t.correct}/{t.attempts} ({t.accuracy:.0%}), best streak {t.best_streak}")
+    missed = stats.most_missed()
+    if missed:
+        lines.append("Most missed: " + ", ".join(
+            f"{magnitude_label(m1)} {OP_SYMBOLS[op]} {magnitude_label(m2)} ({e} of {n})" for op, m1, m2, e, n in missed))
+    return "\n".join(lines)
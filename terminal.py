@@ -0,0 +1,218 @@
+"""Terminal (curses) game mode that never imports Qt.
+
+    python terminal.py [--preset NAME] [--seed N] [--time SECONDS]
+
+Uses the same preferences.json, problem generation, exact grading, game
+clock and logs as the window. The end-of-game summary and history are
+printed to the terminal after curses exits, so they stay in the
+scrollback. Esc ends the game early.
+"""
+import curses
+import random
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from feasibility import analyze, describe, playable
+from game_clock import GameClock, TICK_MS, format_remaining
+from generator import ProblemGenerator, Settings
+from paths import attempts_path, prefs_path, results_path, sessions_path, weakness_path
+from preferences import load_preset
+from stats import OP_SYMBOLS, SessionStats, format_latency_summary, format_session_stats, latency_summary
+
+if TYPE_CHECKING:
+    from attempt_log import AttemptLog
+
+ANSWER_CHARS = set("0123456789.-+eE")
+
+
+class TerminalGame:
+    def __init__(self, prefs: dict, seed: int, game_time: float):
+        self.prefs = prefs
+        settings = Settings.from_prefs(prefs)
+        self.feasibility = analyze(settings)
+        self.settings = playable(settings, self.feasibility)  # same operator check as the window
+        self.seed = seed
+        self.game_time = game_time
+        self.weakness = None
+        if self.settings.mode == "range":
+            # Recorded in every range game, as in the window; the generator only targets it when adaptive
+            from adaptive import WeaknessModel  # sig-figs games never pay for the model
+            self.weakness = WeaknessModel.load(weakness_path())
+        self.generator = ProblemGenerator(self.settings, self.weakness, random.Random(seed))
+        self.clock = GameClock()
+        self.history = []
+        self.stats = SessionStats()
+        self.result_rows = []  # saved to results.sqlite3 in one transaction after the game
+        self.shown = []
+        self.score = 0
+        self.problem = None
+        self.message = describe(self.feasibility)
+        self.text = ""
+        self._shown_ns = 0
+
+    def next_problem(self):
+        self.problem = self.generator.generate()
+        self.shown.append([self.problem.op, str(self.problem.n1), str(self.problem.n2)])
+        self.text = ""
+        self._shown_ns = time.monotonic_ns()
+
+    def submit(self, scr, log: "AttemptLog"):
+        toggles = self.prefs["toggles"]
+        elapsed_ns = time.monotonic_ns() - self._shown_ns
+        p = self.problem
+        graded = p.grade(self.text)
+        if graded is None:
+            self.message = "Please enter a valid number!" if toggles["show_correct"] else ""
+            self._flash(scr, ok=False)
+            return
+        ok, user_str = graded
+        if not toggles["show_correct"]:
+            self.message = ""
+        elif ok:
+            self.message = "Correct!"
+        elif toggles["show_problem_text"]:
+            self.message = f"The correct answer to {p.text} is {p.answer_text}"
+        else:
+            self.message = f"The correct answer to the last problem was: {p.answer_text}"
+        self._flash(scr, ok)
+        self.score += ok
+        self.stats.record(p.op, p.n1, p.n2, ok)
+        if self.weakness is not None:
+            self.weakness.record(p.op, p.n1, p.n2, ok, elapsed_ns)
+        self.history.append({"problem": p.text, "user": user_str, "correct": p.answer_text, "ok": ok,
+                             "op": p.op, "ns": elapsed_ns})
+        ts, n1, n2 = time.time(), str(p.n1), str(p.n2)
+        log.append({"ts": ts, "problem": p.text, "op": p.op, "n1": n1, "n2": n2,
+                    "user": user_str, "correct": p.answer_text, "ok": ok, "ns": elapsed_ns,
+                    "settings": self.settings.digest(), "client": "terminal"})
+        self.result_rows.append((ts, self.settings.mode, p.op, n1, n2, p.answer_text, user_str, ok, elapsed_ns))
+        self.next_problem()
+
+    def _flash(self, scr, ok: bool):
+        toggles = self.prefs["toggles"]
+        if not ok and toggles["show_correct"] and toggles["flash_incorrect"]:
+            curses.flash()
+
+    # ---------------- Screen ----------------
+    def draw(self, scr):
+        scr.erase()
+        h, w = scr.getmaxyx()
+        put = lambda y, x, s, attr=0: scr.addnstr(y, x, s, max(0, w - x - 1), attr) if y < h else None  # noqa: E731
+        put(0, 0, f"Score: {self.score}")
+        left = format_remaining(self.clock.remaining_ns())
+        put(0, max(0, w - len(left) - 1), left)
+        put(2, 2, self.problem.text, curses.A_BOLD)
+        put(4, 2, "> " + self.text)
+        for k, line in enumerate(self.message.splitlines()):
+            put(6 + k, 2, line)
+        put(h - 1, 0, "Enter: answer   Esc: end game", curses.A_DIM)
+        scr.move(min(4, h - 1), min(4 + len(self.text), w - 1))
+        scr.refresh()
+
+    def run(self, scr, log: "AttemptLog"):
+        curses.curs_set(1)
+        self.next_problem()
+        self.clock.start(self.game_time)
+        auto = self.prefs["toggles"]["auto_advance"]
+        while True:
+            if self.clock.expired():
+                break
+            self.draw(scr)
+            # Wake at least every tick to redraw the clock, and never sleep past the deadline
+            scr.timeout(max(1, min(TICK_MS, -(-self.clock.remaining_ns() // 1_000_000))))
+            try:
+                key = scr.get_wch()
+            except curses.error:
+                key = None  # no key this tick
+            self.clock.tick()
+            if key is None:
+                continue
+            if key == "\x1b":
+                break
+            if self.clock.expired():
+                break  # answers after the deadline don't count
+            if key in ("\n", "\r", curses.KEY_ENTER):
+                self.submit(scr, log)
+            elif key in ("\x7f", "\b", curses.KEY_BACKSPACE):
+                self.text = self.text[:-1]
+            elif isinstance(key, str) and key in ANSWER_CHARS:
+                self.text += key
+                if auto and self.text in self.problem.forms:
+                    self.submit(scr, log)
+
+    def session_record(self) -> dict:
+        timing = self.clock.finish()
+        return dict(timing, ts=time.time(), score=self.score, attempts=len(self.history),
+                    settings=self.settings.digest(), seed=self.seed, settings_spec=self.settings.to_dict(),
+                    problems=self.shown, client="terminal")
+
+
+# ---------------- End of game ----------------
+def summary(game: TerminalGame, session: dict) -> str:
+    """Same content as the window's end screen: counts, timing, latency, then the history table."""
+    totals = game.stats.total
+    lines = [f"Correct Answers: {totals.correct}", f"Incorrect Answers: {totals.incorrect}",
+             f"Game length: {session['actual_s']:.2f} s (drift {session['drift_ms']:+.0f} ms)",
+             f"Seed: {game.seed} (settings {session['settings']})"]
+    if game.settings.adaptive and game.weakness is not None:  # as on the window's end screen
+        weakest = game.weakness.weakest(3)
+        if weakest:
+            lines.append("Focus: " + ", ".join(f"{n1} {OP_SYMBOLS[op]} {n2}" for op, n1, n2, _ in weakest))
+    breakdown = format_session_stats(game.stats)
+    if breakdown:
+        lines += ["", breakdown]
+    latency = format_latency_summary(latency_summary(game.history))
+    if latency:
+        lines += ["", latency]
+    if game.history:
+        rows = [("Problem", "Your answer", "Correct answer", "")] + \
+               [(h["problem"], h["user"], h["correct"], "✓" if h["ok"] else "✗") for h in game.history]
+        widths = [max(len(r[i]) for r in rows) for i in range(3)]
+        lines.append("")
+        lines += ["  ".join(c.ljust(wd) for c, wd in zip(r, widths)) + "  " + r[3] for r in rows]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse  # here and below: only the command line and the end of the game need these
+    from attempt_log import AttemptLog
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--preset", help="named preset from preferences.json (default: the active one)")
+    ap.add_argument("--seed", type=lambda s: int(s, 0), help="problem stream seed (default: random)")
+    ap.add_argument("--time", type=float, help="game length in seconds (default: from preferences)")
+    args = ap.parse_args(argv)
+
+    try:
+        prefs = load_preset(prefs_path(), args.preset)
+    except ValueError as e:
+        raise SystemExit(f"terminal: {e}")
+    game = TerminalGame(prefs, args.seed if args.seed is not None else random.SystemRandom().getrandbits(32),
+                        args.time if args.time is not None else prefs["game_time"])
+    if not game.settings.ops:
+        raise SystemExit("terminal: no operation is enabled in these settings")
+    attempts, sessions = AttemptLog(attempts_path()), AttemptLog(sessions_path())
+    try:
+        curses.wrapper(game.run, attempts)
+    except KeyboardInterrupt:
+        pass
+    if not game.clock.running:
+        return 1  # the screen never came up
+    session = game.session_record()
+    sessions.append(session)
+    from results import ResultsStore
+    results = ResultsStore(results_path())
+    results.save_game(session, game.result_rows, client="terminal")
+    if game.weakness is not None:
+        try:
+            game.weakness.save(weakness_path())
+        except OSError:
+            pass
+    attempts.close()
+    sessions.close()
+    results.close()
+    print(summary(game, session))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
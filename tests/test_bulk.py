@@ -0,0 +1,49 @@
+"""bulk.py must make the same accept/reject decisions as the scalar generator."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bulk import _range_draw, _sigfig_draw, cap_mask, generate_batch  # noqa: E402
+from generator import OPS, ProblemGenerator, Settings, compute_answer  # noqa: E402
+from numeric import Num  # noqa: E402
+
+CAPS = {
+    "loose": {"+": 5, "-": 5, "*": 4, "/": 4},
+    "tight": {"+": 1, "-": 1, "*": 2, "/": 1},
+}
+
+
+def _settings(mode: str, caps: dict, **prefs) -> Settings:
+    return Settings.from_prefs(dict(prefs, mode=mode, max_solution_sigfigs=caps))
+
+
+def _cap_ok(settings: Settings, op, m1, e1, m2, e2) -> list:
+    gen = ProblemGenerator(settings)
+    return [gen.cap_ok(OPS[o], compute_answer(Num(a, ea), Num(b, eb), OPS[o]))
+            for o, a, ea, b, eb in zip(op.tolist(), m1.tolist(), e1.tolist(), m2.tolist(), e2.tolist())]
+
+
+@pytest.mark.parametrize("caps", CAPS.values(), ids=CAPS.keys())
+def test_cap_mask_matches_cap_ok_range_mode(caps):
+    settings = _settings("range", caps, ranges={"mul_X": [2, 100]})
+    rng = np.random.default_rng(6)
+    op = rng.integers(0, 4, size=4000)
+    rows = _range_draw(settings, op, rng)
+    assert cap_mask(settings, op, *rows).tolist() == _cap_ok(settings, op, *rows)
+
+
+@pytest.mark.parametrize("caps", CAPS.values(), ids=CAPS.keys())
+def test_cap_mask_matches_cap_ok_sigfigs_mode(caps):
+    settings = _settings("sigfigs", caps, sigfigs={"A_sig": [1, 4], "A_exp": [-3, 3], "B_sig": [1, 3], "B_exp": [-2, 4]})
+    rng = np.random.default_rng(6)
+    op = rng.integers(0, 3, size=4000)  # ÷ goes through the division sampler, not cap_mask
+    rows = _sigfig_draw(settings, op, rng)
+    assert cap_mask(settings, op, *rows).tolist() == _cap_ok(settings, op, *rows)
+
+
+@pytest.mark.parametrize("caps", CAPS.values(), ids=CAPS.keys())
+def test_batch_problems_pass_cap_ok(caps):
+    for mode in ("range", "sigfigs"):
+        settings = _settings(mode, caps)
+        batch = generate_batch(settings, 2000, np.random.default_rng(60))
+        assert all(_cap_ok(settings, batch.op, batch.m1, batch.e1, batch.m2, batch.e2))
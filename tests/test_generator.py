@@ -0,0 +1,101 @@
+"""Seeded checks of the constructive sig-figs division sampler against the rejection loop it replaced."""
+import random
+from collections import Counter
+from decimal import Decimal
+
+import pytest
+
+from generator import SigfigDivisionSampler, decimal_places_leq_one, sigfigs
+
+# (A_sig, A_exp, B_sig, B_exp, max_sig_div)
+SPECS = [
+    ((2, 3), (-2, 3), (2, 3), (-2, 3), 4),  # the defaults
+    ((1, 2), (0, 2), (1, 2), (-1, 1), 3),
+    ((1, 1), (0, 0), (2, 2), (0, 1), 2),
+    ((3, 4), (-2, 2), (2, 3), (-1, 1), 3),
+]
+ATTEMPTS = 60_000
+
+
+def _rand_sigfig_value(rng, sf_range, exp_range) -> Decimal:
+    sf = rng.randint(*sf_range)
+    k = rng.randint(*exp_range)
+    while True:
+        m = rng.randint(10 ** (sf - 1), 10 ** sf - 1)
+        if m % 10 != 0 or sf == 1:
+            break
+    return (Decimal(m) * Decimal(10) ** (k - (sf - 1))).normalize()
+
+
+def _rand_quotient(rng) -> Decimal:
+    if rng.random() < 0.5:
+        return Decimal(rng.randint(-99, 99) or 1)
+    k = rng.randint(-990, 990)
+    if k % 10 == 0:
+        k += 1
+    q = Decimal(k) / Decimal(10)
+    if abs(q) < Decimal('0.1'):
+        q = Decimal('0.1') if q >= 0 else Decimal('-0.1')
+    return q
+
+
+def _old_attempt(rng, A_sig, A_exp, B_sig, B_exp, max_sig_div):
+    """One pass of the pre-sampler rejection loop: (a, b), or None where it would retry."""
+    left_sig, div_sig, div_exp = (A_sig, B_sig, B_exp) if rng.choice([True, False]) else (B_sig, A_sig, A_exp)
+    sf_left = rng.randint(*left_sig)
+    b = _rand_sigfig_value(rng, div_sig, div_exp)
+    if not (div_sig[0] <= sigfigs(b) <= div_sig[1]) or b == 0:
+        return None
+    a = _rand_quotient(rng) * b
+    if sigfigs(a) != sf_left:
+        return None
+    res = a / b
+    if not (sigfigs(res) <= max_sig_div and decimal_places_leq_one(res)):
+        return None
+    return a, b
+
+
+# Marginals compared between the two draws; the sampler's cell weights decide every one of them
+FEATURES = {
+    "sig figs of a": lambda a, b: sigfigs(a),
+    "sig figs of b": lambda a, b: sigfigs(b),
+    "exponent of a": lambda a, b: a.adjusted(),
+    "exponent of b": lambda a, b: b.adjusted(),
+    "sig figs of a / b": lambda a, b: sigfigs(a / b),
+    "a / b < 0": lambda a, b: a / b < 0,
+    "a / b integral": lambda a, b: a / b == (a / b).to_integral_value(),
+}
+
+
+def _total_variation(pairs_p, pairs_q, feature) -> float:
+    p, q = Counter(feature(a, b) for a, b in pairs_p), Counter(feature(a, b) for a, b in pairs_q)
+    return sum(abs(p[k] / len(pairs_p) - q[k] / len(pairs_q)) for k in p.keys() | q.keys()) / 2
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_sampler_matches_rejection_loop(spec):
+    rng = random.Random(2002)
+    old = [p for p in (_old_attempt(rng, *spec) for _ in range(ATTEMPTS)) if p is not None]
+    sampler = SigfigDivisionSampler(*spec)
+
+    rate = len(old) / ATTEMPTS
+    assert abs(rate - sampler.acceptance) < 5 * (rate * (1 - rate) / ATTEMPTS) ** 0.5
+
+    new = [tuple(x.to_decimal() for x in sampler.draw(rng)) for _ in range(len(old))]
+    for name, feature in FEATURES.items():
+        assert _total_variation(old, new, feature) < 0.04, name
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_sampler_honors_specs_and_cap(spec):
+    A_sig, A_exp, B_sig, B_exp, max_sig_div = spec
+    sampler = SigfigDivisionSampler(*spec)
+    rng = random.Random(2)
+    for _ in range(5000):
+        a, b = (x.to_decimal() for x in sampler.draw(rng))
+        q = a / b
+        assert a == q * b
+        assert sigfigs(q) <= max_sig_div and decimal_places_leq_one(q)
+        assert (A_sig[0] <= sigfigs(a) <= A_sig[1] and B_sig[0] <= sigfigs(b) <= B_sig[1]
+                or B_sig[0] <= sigfigs(a) <= B_sig[1] and A_sig[0] <= sigfigs(b) <= A_sig[1])
+
@@ -0,0 +1,9 @@
+from numeric import Num
+
+
+def test_hash_agrees_with_int_equality():
+    for n in (Num(0), Num(7), Num(-7), Num(12, 3), Num.parse("4.0"), Num.parse("-250")):
+        assert n == int(n)
+        assert hash(n) == hash(int(n))
+    assert {Num(5), 5, Num.parse("5.0")} == {5}
+    assert Num.parse("0.5") != 0 and {Num.parse("0.5"), Num(5, -1)} == {Num(5, -1)}
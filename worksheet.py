@@ -0,0 +1,137 @@
+"""Export problem banks with answer keys from the command line.
+
+    python worksheet.py -n 1000000 -o bank.csv
+    python worksheet.py --prefs preferences.json --preset "sig-fig physics" -n 500 -o sheet.jsonl
+
+The count is split into fixed-size shards generated in a ProcessPoolExecutor.
+Each shard has its own seed derived from ``--seed`` and the shard number, so
+the output for a given seed, shard size and engine is the same whatever the
+worker count. Shards come back in order and are streamed straight to the
+output. Problems come from the same generators as the GUI, so the range,
+sig-figs and cap rules are the same. Adaptive targeting needs a player's
+answer history and is not used here.
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import secrets
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from feasibility import analyze, describe, playable
+from generator import OPS, ProblemGenerator, Settings, compute_answer
+from numeric import Num
+from preferences import load_preset
+
+FIELDS = ("index", "op", "n1", "n2", "problem", "answer")
+
+
+def shard_seed(seed: int, shard: int) -> int:
+    """Independent 64-bit seed per shard, stable across runs and worker counts."""
+    return int.from_bytes(hashlib.sha256(f"{seed}:{shard}".encode()).digest()[:8], "big")
+
+
+def _rows(settings: Settings, n: int, seed: int, engine: str) -> Iterator[Tuple[str, str, str, str, str]]:
+    """(op, n1, n2, problem, answer) strings for n problems."""
+    if engine == "scalar":
+        gen = ProblemGenerator(settings, rng=random.Random(seed))
+        for _ in range(n):
+            p = gen.generate()
+            yield p.op, str(p.n1), str(p.n2), p.text, p.answer_text
+        return
+    import numpy as np
+    from bulk import generate_batch
+    b = generate_batch(settings, n, np.random.default_rng(seed))
+    # Batch operands are already normalized; skip Problem.of's answer forms, which a file doesn't need
+    for op, m1, e1, m2, e2 in zip(b.op.tolist(), b.m1.tolist(), b.e1.tolist(), b.m2.tolist(), b.e2.tolist()):
+        op, n1, n2 = OPS[op], Num._raw(m1, e1), Num._raw(m2, e2)
+        s1, s2 = str(n1), str(n2)
+        yield op, s1, s2, f"{s1} {op} {s2}", str(compute_answer(n1, n2, op))
+
+
+def render_shard(job: Tuple[dict, int, int, int, int, str, str]) -> str:
+    """Generate one shard and return it as CSV or JSONL text (runs in a worker)."""
+    spec, seed, shard, start, n, engine, fmt = job
+    settings = Settings.from_dict(spec)
+    rows = ((start + i,) + r for i, r in enumerate(_rows(settings, n, shard_seed(seed, shard), engine)))
+    if fmt == "jsonl":
+        return "".join(json.dumps(dict(zip(FIELDS, r)), separators=(",", ":")) + "\n" for r in rows)
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerows(rows)
+    return buf.getvalue()
+
+
+def plan(n: int, shard_size: int) -> List[Tuple[int, int, int]]:
+    """(shard, first index, count) covering n problems."""
+    return [(i, start, min(shard_size, n - start)) for i, start in enumerate(range(0, n, shard_size))]
+
+
+def _default_engine() -> str:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return "scalar"
+    return "bulk"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", "--count", type=int, required=True, help="number of problems")
+    ap.add_argument("-o", "--output", default="-", help="output file, '-' for stdout (default)")
+    ap.add_argument("--format", choices=("csv", "jsonl"), help="default: from the output suffix, else csv")
+    ap.add_argument("--prefs", help="preferences.json to read settings from (default: built-in defaults)")
+    ap.add_argument("--preset", help="named preset inside --prefs (default: the active one)")
+    ap.add_argument("--seed", type=int, help="base seed (default: random, printed to stderr)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--shard-size", type=int, default=20000)
+    ap.add_argument("--engine", choices=("bulk", "scalar"), default=None,
+                    help="bulk (NumPy, the default when installed) or scalar (the GUI's generator)")
+    args = ap.parse_args(argv)
+
+    settings = Settings()
+    if args.prefs is not None:
+        try:
+            settings = Settings.from_prefs(load_preset(args.prefs, args.preset, required=True))
+        except ValueError as e:
+            raise SystemExit(f"worksheet: {e}")
+    if not settings.ops:
+        raise SystemExit("worksheet: no operation is enabled in these settings")
+    report = analyze(settings)
+    if describe(report):
+        print("worksheet: " + describe(report).replace("\n", "\nworksheet: "), file=sys.stderr)
+    settings = playable(settings, report)
+    fmt = args.format or ("jsonl" if args.output.endswith(".jsonl") else "csv")
+    engine = args.engine or _default_engine()
+    seed = args.seed if args.seed is not None else secrets.randbits(32)
+    jobs = [(settings.to_dict(), seed, shard, start, n, engine, fmt)
+            for shard, start, n in plan(args.count, max(1, args.shard_size))]
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    t0 = time.perf_counter()
+    try:
+        if fmt == "csv":
+            out.write(",".join(FIELDS) + "\n")
+        if args.workers <= 1:
+            for job in jobs:
+                out.write(render_shard(job))
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                # map yields in shard order, so the file is written front to back as shards finish
+                for text in pool.map(render_shard, jobs):
+                    out.write(text)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    dt = time.perf_counter() - t0
+    print(f"worksheet: {args.count} problems ({engine}, {args.workers} workers, seed {seed}, "
+          f"settings {settings.digest()}) in {dt:.2f} s, {args.count / dt:,.0f}/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()